@@ -4,6 +4,13 @@ from . import (
     addon_preferences,
 )
 
+from .libs import (
+    scene_index,
+    dependencies,
+    mekrig_cache,
+    bone_index,
+)
+
 from .panels import (
     info_panel, 
     mektools_import_panel,
@@ -15,9 +22,12 @@ from .panels import (
 )
 from .operators import (
     import_meddle_gltf, 
+    batch_import_meddle,
     import_textools_fbx, 
     export_pose, 
     import_pose,
+    pose_library,
+    pose_sequencer,
     export_glb, 
     mekrig_operators, 
     append_shaders,
@@ -35,11 +45,20 @@ def register():
     #Register all preferences
     addon_preferences.register()
     
+    # Register all services
+    scene_index.register()
+    dependencies.register()
+    mekrig_cache.register()
+    bone_index.register()
+    
     # Register all operators types
     import_meddle_gltf.register()
+    batch_import_meddle.register()
     import_textools_fbx.register()
     export_pose.register()
     import_pose.register()
+    pose_library.register()
+    pose_sequencer.register()
     export_glb.register()
     mekrig_operators.register()
     append_shaders.register()
@@ -67,9 +86,12 @@ def unregister():
     
     # Unregister all operator types
     import_meddle_gltf.unregister()
+    batch_import_meddle.unregister()
     import_textools_fbx.unregister()
     export_pose.unregister()
     import_pose.unregister()
+    pose_library.unregister()
+    pose_sequencer.unregister()
     export_glb.unregister()
     mekrig_operators.unregister()
     append_shaders.unregister()
@@ -78,6 +100,12 @@ def unregister():
     pose_helper.unregister()
     opp_ot.unregister()
    
+    # Unregister all services
+    scene_index.unregister()
+    dependencies.unregister()
+    mekrig_cache.unregister()
+    bone_index.unregister()
+   
     #unregister all preferences
     addon_preferences.unregister() 
     
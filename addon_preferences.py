@@ -1,10 +1,20 @@
 import bpy
 from bpy.types import AddonPreferences
-from bpy.props import StringProperty, EnumProperty
+from bpy.props import StringProperty, EnumProperty, IntProperty
 
 def get_addon_preferences():
     return bpy.context.preferences.addons[__package__].preferences
 
+def get_user_path(sub_path):
+    """Returns a writable directory for this extension's user data, e.g. caches."""
+    return bpy.utils.extension_path_user(__package__, path=sub_path, create=True)
+
+def get_import_cache_path():
+    prefs = get_addon_preferences()
+    if prefs.import_cache_path:
+        return bpy.path.abspath(prefs.import_cache_path)
+    return get_user_path("import_cache")
+
 class MektoolsPreferences(AddonPreferences):
     bl_idname = __package__
 
@@ -34,6 +44,20 @@ class MektoolsPreferences(AddonPreferences):
         items=[('OFF', "Disable", ""), ('ON', "Enable", "")],
         default='OFF'
     ) 
+    
+    general_import_cache: EnumProperty(
+        name="Import Cache",
+        description="Enables/Disables caching of finished Meddle imports, re-importing the same export with the same settings appends the cached result",
+        items=[('OFF', "Disable", ""), ('ON', "Enable", "")],
+        default='OFF'
+    ) 
+    
+    import_cache_size: IntProperty(
+        name="Import Cache Size (MB)",
+        description="Maximum size of the import cache, least recently used entries are removed first",
+        default=2048,
+        min=64
+    ) 
 
     # Default File Paths
     default_meddle_import_path: StringProperty(
@@ -59,6 +83,12 @@ class MektoolsPreferences(AddonPreferences):
         subtype='DIR_PATH',
         description="Select the default directory for importing pose files"
     ) 
+    
+    import_cache_path: StringProperty(
+        name="Import Cache",
+        subtype='DIR_PATH',
+        description="Directory for cached Meddle imports. Uses the extension's user directory if empty"
+    ) 
 
     # Experimental Buttons          
     ex_button_import_pose: EnumProperty(
@@ -146,6 +176,11 @@ class MektoolsPreferences(AddonPreferences):
             draw_toggle("PoseMode Toggle", "general_pose_mode_toggle")
             draw_toggle("Transform Tools", "general_transform_tools")
             
+            box = layout.box()
+            box.label(text="Meddle Import")
+            draw_toggle("Import Cache", "general_import_cache")
+            box.prop(self, "import_cache_size")
+            
         elif self.tabs == 'PATHS':
             box = layout.box()
             box.label(text="Default File Paths")
@@ -153,6 +188,7 @@ class MektoolsPreferences(AddonPreferences):
             box.prop(self, "default_textools_import_path")
             box.prop(self, "default_pose_import_path")
             box.prop(self, "default_pose_export_path")
+            box.prop(self, "import_cache_path")
             
         elif self.tabs == 'EXPERIMENTAL':
             box = layout.box()
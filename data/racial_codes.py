@@ -20,3 +20,25 @@ racial_code_mapping = {
     'c1701': 'Viera Male',
     'c1801': 'Viera Female',
 }
+
+# Mekrig import operator (see mekrig_operators.py) for each racial code
+racial_code_to_operator = {
+    'c0101': 'mektools.import_mekrig_midlander_male',
+    'c0201': 'mektools.import_mekrig_midlander_female',
+    'c0301': 'mektools.import_mekrig_highlander_male',
+    'c0401': 'mektools.import_mekrig_highlander_female',
+    'c0501': 'mektools.import_mekrig_elezen_male',
+    'c0601': 'mektools.import_mekrig_elezen_female',
+    'c0701': 'mektools.import_mekrig_miqote_male',
+    'c0801': 'mektools.import_mekrig_miqote_female',
+    'c0901': 'mektools.import_mekrig_roegadyn_male',
+    'c1001': 'mektools.import_mekrig_roegadyn_female',
+    'c1101': 'mektools.import_mekrig_lalafell_both',
+    'c1201': 'mektools.import_mekrig_lalafell_both',
+    'c1301': 'mektools.import_mekrig_aura_male',
+    'c1401': 'mektools.import_mekrig_aura_female',
+    'c1501': 'mektools.import_mekrig_hrothgar_male',
+    'c1601': 'mektools.import_mekrig_hrothgar_female',
+    'c1701': 'mektools.import_mekrig_viera_male',
+    'c1801': 'mektools.import_mekrig_viera_female',
+}
@@ -0,0 +1,119 @@
+import numpy as np
+from . import pose_io
+
+def read_flat(collection, attr, dtype=np.float32):
+    values = np.empty(len(collection), dtype=dtype)
+    collection.foreach_get(attr, values)
+    return values
+
+class ArmatureState:
+    """Snapshot of armature state an operator changes temporarily: bone collection visibility, constraint mute states and pose channels.
+
+    Used as a context manager, everything captured is restored in bulk on exit. When bones or collections
+    were added or removed in the meantime, the state is restored by name instead.
+    """
+
+    def __init__(self, armature, collections=True, constraints=True, channels=False):
+        self.armature = armature
+        self.use_collections = collections
+        self.use_constraints = constraints
+        self.use_channels = channels
+        self.collection_names = []
+        self.collection_visibility = None
+        self.constraint_keys = []
+        self.constraint_mutes = None
+        self.bone_names = []
+        self.channels = {}
+
+    def __enter__(self):
+        self.capture()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.restore()
+        return False
+
+    def capture(self):
+        armature = self.armature
+        if self.use_collections:
+            collections = armature.data.collections_all
+            self.collection_names = [collection.name for collection in collections]
+            self.collection_visibility = read_flat(collections, "is_visible", dtype=bool)
+
+        bones = armature.pose.bones
+        self.bone_names = [bone.name for bone in bones]
+        if self.use_constraints:
+            self.constraint_keys = [(bone.name, constraint.name) for bone in bones for constraint in bone.constraints]
+            self.constraint_mutes = np.concatenate(
+                [read_flat(bone.constraints, "mute", dtype=bool) for bone in bones] or [np.empty(0, dtype=bool)]
+            )
+        if self.use_channels:
+            self.channels = pose_io.read_channels(armature)
+        return self
+
+    def restore(self, armature=None, channels=None):
+        """Restores everything captured. A different armature gets the state of all bones and collections with matching names."""
+        armature = armature or self.armature
+        if self.use_collections:
+            self.restore_collections(armature)
+        if self.use_constraints:
+            self.restore_constraints(armature)
+        if self.use_channels:
+            self.restore_channels(armature, channels)
+
+    def restore_collections(self, armature):
+        collections = armature.data.collections_all
+        current_names = [collection.name for collection in collections]
+        if current_names == self.collection_names:
+            collections.foreach_set("is_visible", self.collection_visibility)
+            return
+        visibility = dict(zip(self.collection_names, self.collection_visibility))
+        for collection in collections:
+            if collection.name in visibility:
+                collection.is_visible = bool(visibility[collection.name])
+
+    def restore_constraints(self, armature):
+        bones = armature.pose.bones
+        current_keys = [(bone.name, constraint.name) for bone in bones for constraint in bone.constraints]
+        if current_keys == self.constraint_keys:
+            offset = 0
+            for bone in bones:
+                count = len(bone.constraints)
+                if count:
+                    bone.constraints.foreach_set("mute", self.constraint_mutes[offset:offset + count])
+                offset += count
+            return
+        mutes = dict(zip(self.constraint_keys, self.constraint_mutes))
+        for bone in bones:
+            for constraint in bone.constraints:
+                mute = mutes.get((bone.name, constraint.name))
+                if mute is not None:
+                    constraint.mute = bool(mute)
+
+    def restore_channels(self, armature, channels=None):
+        """Writes the captured pose channels back, optionally only the given channel names."""
+        current_names = pose_io.get_bone_names(armature)
+        same_bones = current_names == self.bone_names
+        if not same_bones:
+            captured = {name: i for i, name in enumerate(self.bone_names)}
+            pairs = [(captured[name], i) for i, name in enumerate(current_names) if name in captured]
+            source_indices = [source for source, _target in pairs]
+            target_indices = [target for _source, target in pairs]
+
+        for name, values in self.channels.items():
+            if channels and name not in channels:
+                continue
+            if same_bones:
+                pose_io.write_channel(armature, name, values)
+            else:
+                pose_io.write_channel(armature, name, values[source_indices], target_indices)
+
+    def show_all_collections(self):
+        collections = self.armature.data.collections_all
+        collections.foreach_set("is_visible", np.ones(len(collections), dtype=bool))
+
+    def mute_constraints(self, mute=True):
+        for bone in self.armature.pose.bones:
+            count = len(bone.constraints)
+            if count:
+                bone.constraints.foreach_set("mute", np.full(count, mute, dtype=bool))
@@ -0,0 +1,39 @@
+# Worker script for the Meddle batch importer, run as:
+# blender --background --python batch_worker.py -- <job.json>
+import bpy
+import json
+import sys
+import time
+import traceback
+
+def ensure_addon(module):
+    """Enables Mektools in this Blender instance if the user preferences did not already. default_set adds it to preferences.addons, which the addon preferences are read from."""
+    if module not in bpy.context.preferences.addons:
+        import addon_utils
+        addon_utils.enable(module, default_set=True)
+
+def run_job(job):
+    result = {"file": job["filepath"], "output": job["output"], "seconds": 0.0, "error": None}
+    start = time.perf_counter()
+    try:
+        bpy.ops.wm.read_homefile(use_empty=True)
+        ensure_addon(job["addon"])
+        import_result = bpy.ops.mektools.import_meddle_gltf('EXEC_DEFAULT', filepath=job["filepath"], **job["options"])
+        if 'FINISHED' not in import_result:
+            raise RuntimeError(f"Import returned {import_result}")
+        bpy.ops.wm.save_as_mainfile(filepath=job["output"])
+    except Exception as e:
+        result["error"] = f"{e}\n{traceback.format_exc()}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    with open(argv[0], 'r') as f:
+        job = json.load(f)
+    result = run_job(job)
+    with open(job["result"], 'w') as f:
+        json.dump(result, f, indent=4)
+
+if __name__ == "__main__":
+    main()
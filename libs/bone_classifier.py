@@ -0,0 +1,69 @@
+import bpy
+import re
+from collections import namedtuple
+
+BoneRule = namedtuple("BoneRule", ["collection_name", "keywords", "is_visible", "custom_shape", "palette"])
+
+# Rules are listed by priority, a bone matching several rules is mapped to the first one
+MEKRIG_BONE_RULES = (
+    BoneRule('Hair', ('j_ex', 'j_kami'), True, 'cs.hair', 'THEME01'),
+    BoneRule('Physic', ('phys',), False, None, None),
+    BoneRule('IVCS', ('iv_',), False, None, None),
+)
+
+_compiled_rules = {}
+
+def compile_rules(rules):
+    """Compiles all keyword rules into a single regex with one named group per rule."""
+    matcher = _compiled_rules.get(rules)
+    if matcher is None:
+        pattern = "|".join(
+            f"(?P<r{i}>{'|'.join(re.escape(keyword) for keyword in rule.keywords)})"
+            for i, rule in enumerate(rules)
+        )
+        matcher = re.compile(pattern)
+        _compiled_rules[rules] = matcher
+    return matcher
+
+def match_rules(matcher, name):
+    """Returns the indices of all rules whose keywords occur in the name, in priority order."""
+    matched = set()
+    pos = 0
+    while True:
+        match = matcher.search(name, pos)
+        if not match:
+            break
+        matched.add(int(match.lastgroup[1:]))
+        pos = match.start() + 1
+    return sorted(matched)
+
+def get_or_create_bone_collection(armature, collection_name):
+    bone_collection = armature.data.collections.get(collection_name)
+    if not bone_collection:
+        bone_collection = armature.data.collections.new(name=collection_name)
+    return bone_collection
+
+def classify_bones(armature, rules=MEKRIG_BONE_RULES):
+    """Walks the bones once and assigns bone collections, custom shapes and palette colours for every matching rule. Returns a dict of bone name -> collection name of the first matching rule."""
+    matcher = compile_rules(rules)
+    bone_collections = [get_or_create_bone_collection(armature, rule.collection_name) for rule in rules]
+    custom_shapes = [bpy.data.objects.get(rule.custom_shape) if rule.custom_shape else None for rule in rules]
+
+    categories = {}
+    for pose_bone in armature.pose.bones:
+        matched = match_rules(matcher, pose_bone.name)
+        if not matched:
+            continue
+        categories[pose_bone.name] = rules[matched[0]].collection_name
+        # Reversed so shapes and colours of higher priority rules win
+        for i in reversed(matched):
+            bone_collections[i].assign(pose_bone)
+            if custom_shapes[i]:
+                pose_bone.custom_shape = custom_shapes[i]
+            if rules[i].palette:
+                pose_bone.color.palette = rules[i].palette
+
+    for rule, bone_collection in zip(rules, bone_collections):
+        bone_collection.is_visible = rule.is_visible
+
+    return categories
@@ -0,0 +1,102 @@
+import bpy
+import re
+from bpy.app.handlers import persistent
+from collections import OrderedDict
+from functools import lru_cache
+
+# Bone layouts of recently used armatures, keyed by armature data pointer and bone count. Least recently used layouts are dropped first
+_indices = OrderedDict()
+INDEX_CACHE_SIZE = 8
+# Renaming a bone in the UI drops every cached layout
+RENAME_KEYS = ((bpy.types.Bone, "name"), (bpy.types.EditBone, "name"), (bpy.types.PoseBone, "name"))
+_msgbus_owner = object()
+
+@lru_cache(maxsize=4096)
+def strip_suffix(name):
+    """Remove any .xxx suffix from the bone name."""
+    return re.sub(r'\.\d+$', '', name)
+
+class BoneIndex:
+    """Name lookups for one bone layout: pose bone order, suffix-stripped canonical names and back.
+
+    Only names and indices are stored, pose bones are resolved from the armature passed in, so an index
+    stays valid across undo and can be shared between armatures with the same bones.
+    """
+
+    def __init__(self, bone_names):
+        self.names = bone_names
+        self.canonical_names = tuple(strip_suffix(name) for name in bone_names)
+        self.by_name = {name: i for i, name in enumerate(bone_names)}
+        # First bone wins when several bones share a canonical name
+        self.by_canonical = {}
+        for i, canonical_name in enumerate(self.canonical_names):
+            self.by_canonical.setdefault(canonical_name, i)
+        # Masks derived from this layout, e.g. per bone group
+        self.masks = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def index(self, name):
+        return self.by_name.get(name)
+
+    def find(self, canonical_name):
+        """Returns the index of the first bone with the given suffix-stripped name, or None."""
+        return self.by_canonical.get(canonical_name)
+
+    def canonical(self, name):
+        index = self.by_name.get(name)
+        return self.canonical_names[index] if index is not None else strip_suffix(name)
+
+    def get_pose_bone(self, armature, canonical_name):
+        index = self.by_canonical.get(canonical_name)
+        return armature.pose.bones[index] if index is not None else None
+
+def matches_layout(index, bones):
+    """Spot checks the first, middle and last bone names against a cached index. Catches renames from Python, deleted and re-added bones and reused data pointers without reading every name."""
+    count = len(bones)
+    return all(bones[i].name == index.names[i] for i in {0, count // 2, count - 1} if count)
+
+def get_bone_index(armature):
+    """Returns the bone index of an armature. Hits are keyed by armature data and bone count and verified with a few bone names, all names are only read on a miss."""
+    bones = armature.pose.bones
+    key = (armature.data.as_pointer(), len(bones))
+    index = _indices.get(key)
+    if index is not None and matches_layout(index, bones):
+        _indices.move_to_end(key)
+        return index
+
+    bone_names = tuple(bone.name for bone in bones)
+    index = next((cached for cached in _indices.values() if cached.names == bone_names), None) or BoneIndex(bone_names)
+    _indices[key] = index
+    _indices.move_to_end(key)
+    if len(_indices) > INDEX_CACHE_SIZE:
+        _indices.popitem(last=False)
+    return index
+
+def clear_bone_index_cache(*args):
+    _indices.clear()
+
+def subscribe():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    for key in RENAME_KEYS:
+        bpy.msgbus.subscribe_rna(key=key, owner=_msgbus_owner, args=(), notify=clear_bone_index_cache)
+
+@persistent
+def on_reset(*args):
+    """Data pointers can be reused after undo or loading a file, message bus subscriptions do not survive a load."""
+    clear_bone_index_cache()
+    subscribe()
+
+def register():
+    subscribe()
+    bpy.app.handlers.load_post.append(on_reset)
+    bpy.app.handlers.undo_post.append(on_reset)
+    bpy.app.handlers.redo_post.append(on_reset)
+
+def unregister():
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if on_reset in handlers:
+            handlers.remove(on_reset)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    clear_bone_index_cache()
@@ -0,0 +1,170 @@
+from mathutils import Euler, Matrix, Vector
+from . import pose_engine
+
+SUPPORTED_TYPES = {'COPY_LOCATION', 'COPY_ROTATION', 'COPY_TRANSFORMS'}
+SUPPORTED_SPACES = {'WORLD', 'POSE', 'LOCAL_WITH_PARENT', 'LOCAL'}
+EULER_ORDERS = {'XYZ', 'XZY', 'YXZ', 'YZX', 'ZXY', 'ZYX'}
+
+def has_default_inheritance(bone):
+    return bone.inherit_scale == 'FULL' and bone.use_inherit_rotation and bone.use_local_location
+
+def multiply_scale(scale_a, scale_b):
+    return Vector(a * b for a, b in zip(scale_a, scale_b))
+
+def mix_aligned_scale(matrix_a, matrix_b):
+    """Matrix product that emulates Aligned Inherit Scale, like Blender's mul_m4_m4m4_aligned_scale."""
+    loc_a, rot_a, scale_a = matrix_a.decompose()
+    loc_b, rot_b, scale_b = matrix_b.decompose()
+    return Matrix.LocRotScale(matrix_a @ loc_b, rot_a @ rot_b, multiply_scale(scale_a, scale_b))
+
+def mix_split_channels(matrix_a, matrix_b):
+    """Combines location, rotation and scale separately, like Blender's mul_m4_m4m4_split_channels."""
+    loc_a, rot_a, scale_a = matrix_a.decompose()
+    loc_b, rot_b, scale_b = matrix_b.decompose()
+    return Matrix.LocRotScale(loc_a + loc_b, rot_a @ rot_b, multiply_scale(scale_a, scale_b))
+
+def copy_location(constraint, owner_matrix, target_matrix):
+    result = owner_matrix.copy()
+    offset = owner_matrix.translation.copy() if constraint.use_offset else Vector()
+    axes = zip((constraint.use_x, constraint.use_y, constraint.use_z), (constraint.invert_x, constraint.invert_y, constraint.invert_z))
+    for axis, (use, invert) in enumerate(axes):
+        if use:
+            value = target_matrix[axis][3]
+            result[axis][3] = (-value if invert else value) + offset[axis]
+    return result
+
+def copy_rotation(constraint, owner_matrix, target_matrix, rotation_order):
+    loc, rot, scale = owner_matrix.decompose()
+    old_rotation = rot.to_matrix()
+    order = rotation_order if constraint.euler_order == 'AUTO' else constraint.euler_order
+
+    owner_euler = owner_matrix.to_euler(order)
+    euler = target_matrix.to_3x3().normalized().to_euler(order, owner_euler)
+    default_euler = owner_euler if constraint.mix_mode == 'REPLACE' else Euler((0.0, 0.0, 0.0), order)
+
+    axes = zip((constraint.use_x, constraint.use_y, constraint.use_z), (constraint.invert_x, constraint.invert_y, constraint.invert_z))
+    for axis, (use, invert) in enumerate(axes):
+        if not use:
+            euler[axis] = default_euler[axis]
+        elif invert:
+            euler[axis] *= -1
+    if constraint.mix_mode == 'ADD':
+        for axis in range(3):
+            euler[axis] += owner_euler[axis]
+    euler.make_compatible(owner_euler)
+
+    new_rotation = euler.to_matrix()
+    if constraint.mix_mode == 'BEFORE':
+        new_rotation = new_rotation @ old_rotation
+    elif constraint.mix_mode == 'AFTER':
+        new_rotation = old_rotation @ new_rotation
+    return Matrix.LocRotScale(loc, new_rotation, scale)
+
+def copy_transforms(constraint, owner_matrix, target_matrix):
+    if constraint.remove_target_shear:
+        target_matrix = Matrix.LocRotScale(*target_matrix.decompose())
+    mix_mode = constraint.mix_mode
+    if mix_mode == 'BEFORE_FULL':
+        return target_matrix @ owner_matrix
+    if mix_mode == 'AFTER_FULL':
+        return owner_matrix @ target_matrix
+    if mix_mode == 'BEFORE':
+        return mix_aligned_scale(target_matrix, owner_matrix)
+    if mix_mode == 'AFTER':
+        return mix_aligned_scale(owner_matrix, target_matrix)
+    if mix_mode == 'BEFORE_SPLIT':
+        return mix_split_channels(target_matrix, owner_matrix)
+    if mix_mode == 'AFTER_SPLIT':
+        return mix_split_channels(owner_matrix, target_matrix)
+    return target_matrix.copy()
+
+class PoseSolver:
+    """Evaluates the forward kinematics of an armature straight from its pose channels, without a depsgraph evaluation. Constraints are expected to be muted."""
+
+    def __init__(self, armature):
+        self.armature = armature
+        self.world = armature.matrix_world.copy()
+        self.world_inverse = self.world.inverted_safe()
+        self.pose_matrices = {}
+        # Bones whose whole parent chain uses default inheritance can be solved exactly
+        self.exact = {}
+        for pose_bone in pose_engine.get_bones_parent_first(armature):
+            parent_exact = self.exact[pose_bone.parent.name] if pose_bone.parent else True
+            self.exact[pose_bone.name] = parent_exact and has_default_inheritance(pose_bone.bone)
+
+    def get_rest_offset(self, pose_bone):
+        """Pose space matrix of the bone with an identity basis."""
+        bone = pose_bone.bone
+        if pose_bone.parent is None:
+            return bone.matrix_local.copy()
+        return self.get_pose_matrix(pose_bone.parent) @ bone.parent.matrix_local.inverted() @ bone.matrix_local
+
+    def get_pose_matrix(self, pose_bone):
+        matrix = self.pose_matrices.get(pose_bone.name)
+        if matrix is None:
+            matrix = self.pose_matrices[pose_bone.name] = self.get_rest_offset(pose_bone) @ pose_bone.matrix_basis
+        return matrix
+
+    def set_pose_matrix(self, pose_bone, matrix):
+        """Sets the basis so the bone ends up at the given pose space matrix, like visual_transform_apply."""
+        pose_bone.matrix_basis = self.get_rest_offset(pose_bone).inverted_safe() @ matrix
+        self.invalidate(pose_bone)
+
+    def invalidate(self, pose_bone):
+        """Forgets the cached matrices of a bone and everything parented to it."""
+        self.pose_matrices.pop(pose_bone.name, None)
+        for child in pose_bone.children_recursive:
+            self.pose_matrices.pop(child.name, None)
+
+    def to_space(self, pose_bone, matrix, space):
+        """Converts a pose space matrix into a constraint space, like BKE_constraint_mat_convertspace."""
+        if space == 'WORLD':
+            return self.world @ matrix
+        if space == 'LOCAL_WITH_PARENT':
+            return pose_bone.bone.matrix_local.inverted() @ matrix
+        if space == 'LOCAL':
+            return self.get_rest_offset(pose_bone).inverted_safe() @ matrix
+        return matrix.copy()
+
+    def from_space(self, pose_bone, matrix, space):
+        if space == 'WORLD':
+            return self.world_inverse @ matrix
+        if space == 'LOCAL_WITH_PARENT':
+            return pose_bone.bone.matrix_local @ matrix
+        if space == 'LOCAL':
+            return self.get_rest_offset(pose_bone) @ matrix
+        return matrix.copy()
+
+    def can_solve(self, constraint, owner, target):
+        """Whether a copy constraint from target onto owner can be solved without Blender evaluating it."""
+        if constraint.type not in SUPPORTED_TYPES:
+            return False
+        if constraint.owner_space not in SUPPORTED_SPACES or constraint.target_space not in SUPPORTED_SPACES:
+            return False
+        # The legacy offset mode rotates euler axes one by one, that is left to Blender
+        if constraint.type == 'COPY_ROTATION' and constraint.mix_mode == 'OFFSET':
+            return False
+        if owner.id_data != self.armature or target.id_data != self.armature:
+            return False
+        return self.exact.get(owner.name, False) and self.exact.get(target.name, False)
+
+    def solve_copy_constraint(self, constraint, owner, target):
+        """Returns the pose space matrix the owner gets from a copy constraint with the settings of the given constraint, targeting target."""
+        owner_pose = self.get_pose_matrix(owner)
+        owner_matrix = self.to_space(owner, owner_pose, constraint.owner_space)
+        target_matrix = self.to_space(target, self.get_pose_matrix(target), constraint.target_space)
+
+        if constraint.type == 'COPY_LOCATION':
+            result = copy_location(constraint, owner_matrix, target_matrix)
+        elif constraint.type == 'COPY_ROTATION':
+            rotation_order = owner.rotation_mode if owner.rotation_mode in EULER_ORDERS else 'XYZ'
+            result = copy_rotation(constraint, owner_matrix, target_matrix, rotation_order)
+        else:
+            result = copy_transforms(constraint, owner_matrix, target_matrix)
+        result = self.from_space(owner, result, constraint.owner_space)
+
+        # Blender blends partial influence in world space
+        if constraint.influence < 1.0:
+            blended = (self.world @ owner_pose).lerp(self.world @ result, constraint.influence)
+            result = self.world_inverse @ blended
+        return result
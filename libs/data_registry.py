@@ -0,0 +1,63 @@
+import json
+import os
+from types import MappingProxyType
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data")
+BONE_GROUPS_FILE = os.path.join(DATA_PATH, "bone_groups.json")
+
+# Everything is built on first use and kept for the session
+_registry = {}
+
+def _get(key, build):
+    value = _registry.get(key)
+    if value is None:
+        value = _registry[key] = build()
+    return value
+
+def _build_bone_names():
+    from ..data import bone_names
+    return tuple(bone_names.bone_names)
+
+def get_bone_names():
+    """Mekrig bone names from data/bone_names.py, in file order."""
+    return _get("bone_names", _build_bone_names)
+
+def get_bone_name_set():
+    return _get("bone_name_set", lambda: frozenset(get_bone_names()))
+
+def get_bone_name_index():
+    """Bone name -> position in data/bone_names.py."""
+    return _get("bone_name_index", lambda: MappingProxyType({name: i for i, name in enumerate(get_bone_names())}))
+
+def _build_bone_groups():
+    with open(BONE_GROUPS_FILE) as f:
+        groups = json.load(f)
+    return MappingProxyType({group: tuple(bones) for group, bones in groups.items()})
+
+def get_bone_groups():
+    """Group name -> bone names from data/bone_groups.json."""
+    return _get("bone_groups", _build_bone_groups)
+
+def _build_bone_group_lookup():
+    lookup = {}
+    for group, bones in get_bone_groups().items():
+        for bone in bones:
+            lookup.setdefault(bone, []).append(group)
+    return MappingProxyType({bone: tuple(groups) for bone, groups in lookup.items()})
+
+def get_bone_group_lookup():
+    """Bone name -> groups it belongs to."""
+    return _get("bone_group_lookup", _build_bone_group_lookup)
+
+def get_race_names():
+    """Racial code -> race name."""
+    from ..data import racial_codes
+    return _get("race_names", lambda: MappingProxyType(dict(racial_codes.racial_code_mapping)))
+
+def get_race_operators():
+    """Racial code -> Mekrig import operator id."""
+    from ..data import racial_codes
+    return _get("race_operators", lambda: MappingProxyType(dict(racial_codes.racial_code_to_operator)))
+
+def clear():
+    _registry.clear()
@@ -0,0 +1,68 @@
+import bpy
+import addon_utils
+from bpy.app.handlers import persistent
+from collections import namedtuple
+
+MEDDLE_NAME = "Meddle Tools"
+MEDDLE_OPERATORS = ("import_shaders", "apply_to_selected")
+
+MeddleStatus = namedtuple("MeddleStatus", ["installed", "enabled", "has_operators"])
+
+# Module name of the Meddle addon, "" if it is not installed, None if not looked up yet
+_meddle_module = None
+# Number of enabled addons when Meddle was last looked up, installing an addon enables it
+_addon_count = None
+_meddle_status = None
+
+def get_meddle_module():
+    """Finds the Meddle addon module. The addon folders are only scanned again when the set of enabled addons changes and Meddle was not found."""
+    global _meddle_module, _addon_count
+    addon_count = len(bpy.context.preferences.addons)
+    if _meddle_module is None or (not _meddle_module and addon_count != _addon_count):
+        _meddle_module = ""
+        for mod in addon_utils.modules(refresh=_addon_count is not None):
+            if addon_utils.module_bl_info(mod).get("name") == MEDDLE_NAME:
+                _meddle_module = mod.__name__
+                break
+        _addon_count = addon_count
+    return _meddle_module
+
+def has_meddle_operators():
+    # Operators of an addon installed in this session only show up after a restart
+    try:
+        for name in MEDDLE_OPERATORS:
+            getattr(bpy.ops.meddle, name).poll()
+    except (AttributeError, RuntimeError, KeyError):
+        return False
+    return True
+
+def get_meddle_status():
+    """Returns the cached MeddleStatus. Only an addon being enabled or disabled, or a file load, resolves it again."""
+    global _meddle_status
+    module = get_meddle_module()
+    enabled = bool(module) and module in bpy.context.preferences.addons
+    if _meddle_status is None or _meddle_status.installed != bool(module) or _meddle_status.enabled != enabled:
+        _meddle_status = MeddleStatus(bool(module), enabled, enabled and has_meddle_operators())
+    return _meddle_status
+
+def is_meddle_available():
+    status = get_meddle_status()
+    return status.installed and status.has_operators
+
+def invalidate():
+    global _meddle_module, _addon_count, _meddle_status
+    _meddle_module = None
+    _addon_count = None
+    _meddle_status = None
+
+@persistent
+def on_file_load(*args):
+    invalidate()
+
+def register():
+    bpy.app.handlers.load_post.append(on_file_load)
+
+def unregister():
+    if on_file_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_file_load)
+    invalidate()
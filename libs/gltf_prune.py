@@ -0,0 +1,271 @@
+import json
+import os
+import struct
+import tempfile
+from urllib.parse import quote, unquote
+from .gltf_scan import GLB_MAGIC, GLB_CHUNK_JSON, GLB_CHUNK_BIN
+
+# Animation channels the Meddle importer still reads after import (bone scales), everything else is discarded anyway
+KEEP_ANIMATION_PATHS = {"scale"}
+
+# Extensions that only add material, texture or light data the pruner remaps or leaves alone. Anything else, e.g.
+# Draco or meshopt compression, can reference buffer views in ways the pruner does not know about
+SUPPORTED_EXTENSION_PREFIXES = ("KHR_materials_",)
+SUPPORTED_EXTENSIONS = {"KHR_texture_transform", "KHR_texture_basisu", "EXT_texture_webp", "KHR_mesh_quantization", "KHR_lights_punctual"}
+
+# Bytes copied per read when streaming buffer views into the pruned file
+COPY_CHUNK_SIZE = 1 << 20
+
+def load_gltf(filepath):
+    """Loads the JSON of a .gltf or .glb file. Returns (gltf json, file offset of the GLB binary chunk or None)."""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".gltf":
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f), None
+
+    with open(filepath, 'rb') as f:
+        magic, version, length = struct.unpack("<4sII", f.read(12))
+        if magic != GLB_MAGIC:
+            raise ValueError(f"Not a binary glTF file: {filepath}")
+        gltf = None
+        binary_offset = None
+        while f.tell() < length:
+            chunk_length, chunk_type = struct.unpack("<II", f.read(8))
+            if chunk_type == GLB_CHUNK_JSON:
+                gltf = json.loads(f.read(chunk_length).decode('utf-8'))
+                continue
+            if chunk_type == GLB_CHUNK_BIN and binary_offset is None:
+                binary_offset = f.tell()
+            f.seek(chunk_length, os.SEEK_CUR)
+    if gltf is None:
+        raise ValueError(f"No JSON chunk found in {filepath}")
+    return gltf, binary_offset
+
+def is_supported(gltf):
+    """Returns False if the file requires or uses an extension the pruner cannot safely remap."""
+    extensions = set(gltf.get("extensionsUsed", [])) | set(gltf.get("extensionsRequired", []))
+    return all(name in SUPPORTED_EXTENSIONS or name.startswith(SUPPORTED_EXTENSION_PREFIXES) for name in extensions)
+
+def build_remap(count, used):
+    """Returns old index -> new index for all used indices, keeping their order."""
+    return {old: new for new, old in enumerate(i for i in range(count) if i in used)}
+
+def filter_list(items, remap):
+    return [item for i, item in enumerate(items) if i in remap]
+
+def find_texture_refs(value, refs, key=""):
+    """Recursively collects textureInfo dicts ({"index": n}) inside a material."""
+    if isinstance(value, dict):
+        if "exture" in key and isinstance(value.get("index"), int):
+            refs.append(value)
+        for child_key, child in value.items():
+            find_texture_refs(child, refs, child_key)
+    elif isinstance(value, list):
+        for child in value:
+            find_texture_refs(child, refs, key)
+    return refs
+
+def find_image_refs(texture):
+    """Returns all dicts inside a texture that reference an image through 'source'."""
+    refs = [texture] if "source" in texture else []
+    for extension in texture.get("extensions", {}).values():
+        if isinstance(extension, dict) and "source" in extension:
+            refs.append(extension)
+    return refs
+
+def prune_animations(gltf, keep_paths):
+    animations = []
+    for animation in gltf.get("animations", []):
+        channels = [channel for channel in animation.get("channels", []) if channel.get("target", {}).get("path") in keep_paths]
+        if not channels:
+            continue
+        animation["channels"] = channels
+        animations.append(animation)
+    gltf["animations"] = animations
+
+def prune_samplers(gltf):
+    for animation in gltf.get("animations", []):
+        sampler_remap = build_remap(len(animation["samplers"]), {channel["sampler"] for channel in animation["channels"]})
+        for channel in animation["channels"]:
+            channel["sampler"] = sampler_remap[channel["sampler"]]
+        animation["samplers"] = filter_list(animation["samplers"], sampler_remap)
+
+def prune_nodes(gltf):
+    nodes = gltf.get("nodes", [])
+    used = set()
+    stack = [node for scene in gltf.get("scenes", []) for node in scene.get("nodes", [])]
+    while stack:
+        index = stack.pop()
+        if index in used:
+            continue
+        used.add(index)
+        stack.extend(nodes[index].get("children", []))
+    # Joints must survive even if a broken export left them outside the scene tree
+    for index in list(used):
+        skin = nodes[index].get("skin")
+        if skin is not None:
+            used.update(gltf["skins"][skin].get("joints", []))
+
+    remap = build_remap(len(nodes), used)
+    gltf["nodes"] = filter_list(nodes, remap)
+    for node in gltf["nodes"]:
+        if "children" in node:
+            node["children"] = [remap[child] for child in node["children"] if child in remap]
+    for scene in gltf.get("scenes", []):
+        scene["nodes"] = [remap[node] for node in scene.get("nodes", []) if node in remap]
+    for skin in gltf.get("skins", []):
+        skin["joints"] = [remap[joint] for joint in skin.get("joints", []) if joint in remap]
+        if "skeleton" in skin:
+            if skin["skeleton"] in remap:
+                skin["skeleton"] = remap[skin["skeleton"]]
+            else:
+                del skin["skeleton"]
+    for animation in gltf.get("animations", []):
+        animation["channels"] = [channel for channel in animation["channels"] if channel["target"].get("node") in remap]
+        for channel in animation["channels"]:
+            channel["target"]["node"] = remap[channel["target"]["node"]]
+    gltf["animations"] = [animation for animation in gltf.get("animations", []) if animation["channels"]]
+
+def accessor_refs(gltf):
+    """Yields (container, key) pairs of every accessor reference."""
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh.get("primitives", []):
+            for key in primitive.get("attributes", {}):
+                yield primitive["attributes"], key
+            if "indices" in primitive:
+                yield primitive, "indices"
+            for target in primitive.get("targets", []):
+                for key in target:
+                    yield target, key
+    for skin in gltf.get("skins", []):
+        if "inverseBindMatrices" in skin:
+            yield skin, "inverseBindMatrices"
+    for animation in gltf.get("animations", []):
+        for sampler in animation.get("samplers", []):
+            yield sampler, "input"
+            yield sampler, "output"
+
+def prune_accessors(gltf):
+    refs = list(accessor_refs(gltf))
+    remap = build_remap(len(gltf.get("accessors", [])), {container[key] for container, key in refs})
+    for container, key in refs:
+        container[key] = remap[container[key]]
+    gltf["accessors"] = filter_list(gltf.get("accessors", []), remap)
+
+def prune_images(gltf):
+    texture_refs = [ref for material in gltf.get("materials", []) for ref in find_texture_refs(material, [])]
+    texture_remap = build_remap(len(gltf.get("textures", [])), {ref["index"] for ref in texture_refs})
+    for ref in texture_refs:
+        ref["index"] = texture_remap[ref["index"]]
+    gltf["textures"] = filter_list(gltf.get("textures", []), texture_remap)
+
+    image_refs = [ref for texture in gltf["textures"] for ref in find_image_refs(texture)]
+    image_remap = build_remap(len(gltf.get("images", [])), {ref["source"] for ref in image_refs})
+    for ref in image_refs:
+        ref["source"] = image_remap[ref["source"]]
+    gltf["images"] = filter_list(gltf.get("images", []), image_remap)
+
+def prune_buffer_views(gltf):
+    refs = []
+    for accessor in gltf.get("accessors", []):
+        if "bufferView" in accessor:
+            refs.append(accessor)
+        sparse = accessor.get("sparse")
+        if sparse:
+            refs.append(sparse["indices"])
+            refs.append(sparse["values"])
+    refs.extend(image for image in gltf.get("images", []) if "bufferView" in image)
+
+    remap = build_remap(len(gltf.get("bufferViews", [])), {ref["bufferView"] for ref in refs})
+    for ref in refs:
+        ref["bufferView"] = remap[ref["bufferView"]]
+    gltf["bufferViews"] = filter_list(gltf.get("bufferViews", []), remap)
+
+def layout_binary(gltf):
+    """Packs the buffer views that are still used into a new GLB binary chunk. Returns (copies, chunk length), copies are (old offset, length, new offset)."""
+    copies = []
+    offset = 0
+    for view in gltf["bufferViews"]:
+        if view.get("buffer", 0) != 0:
+            continue
+        offset += (4 - offset % 4) % 4
+        copies.append((view.get("byteOffset", 0), view["byteLength"], offset))
+        view["byteOffset"] = offset
+        offset += view["byteLength"]
+    gltf["buffers"][0]["byteLength"] = offset
+    return copies, offset
+
+def make_uris_absolute(gltf, source_directory):
+    """Rewrites relative buffer and image URIs so the pruned file can live in another directory."""
+    for item in gltf.get("buffers", []) + gltf.get("images", []):
+        uri = item.get("uri")
+        if uri and not uri.startswith("data:"):
+            item["uri"] = quote(os.path.join(source_directory, unquote(uri)).replace("\\", "/"), safe="/:")
+
+def prune(gltf, keep_animation_paths=KEEP_ANIMATION_PATHS):
+    """Strips animations, unreferenced nodes, unused accessors and orphaned images. Returns False and leaves the file untouched if it uses unsupported extensions."""
+    if not is_supported(gltf):
+        return False
+    prune_animations(gltf, keep_animation_paths)
+    prune_nodes(gltf)
+    prune_samplers(gltf)
+    prune_accessors(gltf)
+    prune_images(gltf)
+    prune_buffer_views(gltf)
+    for key in ("animations", "accessors", "bufferViews", "textures", "images"):
+        if key in gltf and not gltf[key]:
+            del gltf[key]
+    return True
+
+def write_glb(filepath, gltf, source_path, binary_offset):
+    """Writes a GLB file, streaming the used buffer views from the source file instead of loading its binary chunk."""
+    copies, binary_length = layout_binary(gltf) if binary_offset is not None and gltf.get("buffers") else ([], 0)
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode('utf-8')
+    json_chunk += b" " * ((4 - len(json_chunk) % 4) % 4)
+    padded_length = binary_length + (4 - binary_length % 4) % 4
+    length = 12 + 8 + len(json_chunk)
+    if padded_length:
+        length += 8 + padded_length
+    with open(filepath, 'wb') as f:
+        f.write(struct.pack("<4sII", GLB_MAGIC, 2, length))
+        f.write(struct.pack("<II", len(json_chunk), GLB_CHUNK_JSON))
+        f.write(json_chunk)
+        if not padded_length:
+            return
+        f.write(struct.pack("<II", padded_length, GLB_CHUNK_BIN))
+        written = 0
+        with open(source_path, 'rb') as source:
+            for source_offset, byte_length, target_offset in copies:
+                f.write(b"\0" * (target_offset - written))
+                source.seek(binary_offset + source_offset)
+                remaining = byte_length
+                while remaining:
+                    data = source.read(min(remaining, COPY_CHUNK_SIZE))
+                    if not data:
+                        raise ValueError(f"Buffer view runs past the end of {source_path}")
+                    f.write(data)
+                    remaining -= len(data)
+                written = target_offset + byte_length
+        f.write(b"\0" * (padded_length - written))
+
+def write_pruned(filepath):
+    """Writes a pruned temporary copy of a glTF file. Returns its path, the caller is responsible for removing it. Files that cannot be pruned safely return the original path."""
+    gltf, binary_offset = load_gltf(filepath)
+    if not prune(gltf):
+        print(f"[Mektools] {os.path.basename(filepath)} uses glTF extensions the pruner does not support, importing it unchanged.")
+        return filepath
+    make_uris_absolute(gltf, os.path.dirname(os.path.abspath(filepath)))
+
+    ext = os.path.splitext(filepath)[1].lower()
+    handle, pruned_path = tempfile.mkstemp(prefix="mektools_", suffix=ext)
+    os.close(handle)
+    try:
+        if ext == ".glb":
+            write_glb(pruned_path, gltf, filepath, binary_offset)
+        else:
+            with open(pruned_path, 'w', encoding='utf-8') as f:
+                json.dump(gltf, f, separators=(",", ":"))
+    except Exception:
+        os.remove(pruned_path)
+        raise
+    return pruned_path
@@ -0,0 +1,81 @@
+import json
+import os
+import re
+import struct
+from collections import namedtuple
+
+GLB_MAGIC = b"glTF"
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN = 0x004E4942
+
+GltfSummary = namedtuple("GltfSummary", ["race_codes", "mesh_names", "material_names", "joint_names", "animation_count", "image_uris"])
+
+def read_gltf_json(filepath):
+    """Reads only the JSON part of a .gltf or .glb file. Binary chunks and buffers are never read."""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".gltf":
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    if ext != ".glb":
+        raise ValueError(f"Unsupported file extension: {ext}")
+
+    with open(filepath, 'rb') as f:
+        magic, version, length = struct.unpack("<4sII", f.read(12))
+        if magic != GLB_MAGIC:
+            raise ValueError(f"Not a binary glTF file: {filepath}")
+        chunk_length, chunk_type = struct.unpack("<II", f.read(8))
+        if chunk_type != GLB_CHUNK_JSON:
+            raise ValueError(f"First chunk of {filepath} is not JSON")
+        return json.loads(f.read(chunk_length).decode('utf-8'))
+
+def summarize(gltf):
+    """Pulls the information the import pipeline needs out of a parsed glTF JSON document."""
+    race_codes = []
+    for key in ("scenes", "nodes", "meshes"):
+        for item in gltf.get(key, []):
+            extras = item.get("extras")
+            race_code = extras.get("raceCode") if isinstance(extras, dict) else None
+            if race_code is not None and race_code not in race_codes:
+                race_codes.append(race_code)
+
+    nodes = gltf.get("nodes", [])
+    joint_names = []
+    for skin in gltf.get("skins", []):
+        for joint in skin.get("joints", []):
+            if joint < len(nodes):
+                joint_names.append(nodes[joint].get("name", f"node_{joint}"))
+
+    return GltfSummary(
+        race_codes=race_codes,
+        mesh_names=[mesh.get("name", "") for mesh in gltf.get("meshes", [])],
+        material_names=[mat.get("name", "") for mat in gltf.get("materials", [])],
+        joint_names=joint_names,
+        animation_count=len(gltf.get("animations", [])),
+        image_uris=[image["uri"] for image in gltf.get("images", []) if "uri" in image and not image["uri"].startswith("data:")],
+    )
+
+def scan(filepath):
+    """Returns a GltfSummary of the file, or None if it could not be read."""
+    try:
+        return summarize(read_gltf_json(filepath))
+    except (OSError, ValueError, struct.error) as e:
+        print(f"[Mektools] Failed to pre-scan {filepath}: {e}")
+        return None
+
+def get_racial_code(summary, racial_codes):
+    """Picks the racial code from a GltfSummary, checking raceCode extras first and iris.shpk materials second. Returns None if not found."""
+    if not summary:
+        return None
+    for race_code in summary.race_codes:
+        racial_code = f'c{race_code}'
+        if racial_code in racial_codes:
+            return racial_code
+
+    for material_name in summary.material_names:
+        if 'iris.shpk' in material_name.lower():
+            match = re.search(r'c(\d{4})', material_name.lower())
+            if match:
+                racial_code = f'c{match.group(1)}'
+                if racial_code in racial_codes:
+                    return racial_code
+    return None
@@ -1,4 +1,5 @@
 import bpy
+from functools import lru_cache
 
 def get_unique_name(base_name, existing_names):
     """Generate a unique name by appending a number if needed."""
@@ -33,8 +34,17 @@ def dupe_with_childs(armature):
     bpy.ops.object.duplicate_move()
     
     
+@lru_cache(maxsize=None)
+def get_object_type_icon(obj_type):
+    return bpy.types.Object.bl_rna.properties['type'].enum_items[obj_type].icon
+
 def get_object_icon(obj):
-    return bpy.types.Object.bl_rna.properties['type'].enum_items[obj.type].icon
+    return get_object_type_icon(obj.type)
+
+def set_cursor(cursor):
+    """Sets the window cursor, does nothing when running in background mode."""
+    if bpy.context.window:
+        bpy.context.window.cursor_set(cursor)
 
 def normalize_edit_mode(mode_str):
     if mode_str[:4] == "EDIT":
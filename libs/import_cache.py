@@ -0,0 +1,166 @@
+import bpy
+import hashlib
+import json
+import os
+import tempfile
+import time
+import tomllib
+from urllib.parse import unquote
+from . import gltf_scan
+
+# Bump whenever the import pipeline changes in a way that makes old cache entries wrong
+CACHE_VERSION = 1
+INDEX_FILE = "index.json"
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "blender_manifest.toml")
+
+_addon_version = None
+
+def get_addon_version():
+    """Returns the extension version from the manifest, read once per session."""
+    global _addon_version
+    if _addon_version is None:
+        try:
+            with open(MANIFEST_PATH, 'rb') as f:
+                _addon_version = tomllib.load(f).get("version", "")
+        except (OSError, tomllib.TOMLDecodeError) as e:
+            print(f"[Mektools] Failed to read the addon version: {e}")
+            _addon_version = ""
+    return _addon_version
+
+def get_dependency_paths(filepath):
+    """Returns the file and every external buffer/image it references."""
+    paths = [filepath]
+    if filepath.lower().endswith(".gltf"):
+        try:
+            gltf = gltf_scan.read_gltf_json(filepath)
+        except (OSError, ValueError) as e:
+            print(f"[Mektools] Failed to read glTF dependencies: {e}")
+            return paths
+        directory = os.path.dirname(filepath)
+        for item in gltf.get("buffers", []) + gltf.get("images", []):
+            uri = item.get("uri")
+            if uri and not uri.startswith("data:"):
+                paths.append(os.path.join(directory, unquote(uri)))
+    return paths
+
+def compute_key(filepath, options):
+    """Hashes the file contents, its external dependencies, the import options and the addon version."""
+    hasher = hashlib.sha1()
+    hasher.update(f"{CACHE_VERSION}|{get_addon_version()}|{json.dumps(options, sort_keys=True)}".encode('utf-8'))
+    for path in get_dependency_paths(filepath):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(block)
+    return hasher.hexdigest()
+
+def load_index(cache_dir):
+    index_path = os.path.join(cache_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[Mektools] Import cache index is unreadable, starting fresh: {e}")
+        return {}
+
+def save_index(cache_dir, index, removed=()):
+    """Merges the entries into the index on disk and atomically replaces it, so concurrent Blender sessions do not drop each other's entries."""
+    merged = load_index(cache_dir)
+    for key, entry in index.items():
+        current = merged.get(key)
+        if current is None or current.get("last_used", 0) <= entry["last_used"]:
+            merged[key] = entry
+    for key in removed:
+        merged.pop(key, None)
+
+    handle, temp_path = tempfile.mkstemp(prefix="index_", suffix=".tmp", dir=cache_dir)
+    try:
+        with os.fdopen(handle, 'w') as f:
+            json.dump(merged, f, indent=4)
+        os.replace(temp_path, os.path.join(cache_dir, INDEX_FILE))
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def drop_entry(cache_dir, index, key):
+    """Removes a broken entry from the index. Failing to write the index only costs a rebuild later."""
+    del index[key]
+    try:
+        save_index(cache_dir, {}, removed=(key,))
+    except OSError as e:
+        print(f"[Mektools] Failed to update import cache index: {e}")
+
+def evict(cache_dir, index, max_bytes):
+    """Removes least recently used entries until the cache fits into max_bytes. Returns the removed keys."""
+    removed = []
+    total = sum(entry["size"] for entry in index.values())
+    for key, entry in sorted(index.items(), key=lambda item: item[1]["last_used"]):
+        if total <= max_bytes:
+            break
+        path = os.path.join(cache_dir, entry["file"])
+        if os.path.exists(path):
+            os.remove(path)
+        total -= entry["size"]
+        del index[key]
+        removed.append(key)
+    return removed
+
+def load(cache_dir, key):
+    """Appends a cached import to the scene collection. Returns the appended collection or objects, or None on a cache miss."""
+    index = load_index(cache_dir)
+    entry = index.get(key)
+    if not entry:
+        return None
+    path = os.path.join(cache_dir, entry["file"])
+    if not os.path.exists(path):
+        drop_entry(cache_dir, index, key)
+        return None
+
+    try:
+        with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+            if entry["collection"]:
+                data_to.collections = [entry["collection"]]
+            else:
+                data_to.objects = [name for name in entry["objects"] if name in data_from.objects]
+    except OSError as e:
+        print(f"[Mektools] Cached import is unreadable, importing again: {e}")
+        drop_entry(cache_dir, index, key)
+        return None
+
+    target = bpy.context.scene.collection
+    if entry["collection"]:
+        result = data_to.collections[0]
+        target.children.link(result)
+    else:
+        result = [obj for obj in data_to.objects if obj]
+        for obj in result:
+            target.objects.link(obj)
+
+    entry["last_used"] = time.time()
+    try:
+        save_index(cache_dir, {key: entry})
+    except OSError as e:
+        print(f"[Mektools] Failed to update import cache index: {e}")
+    return result
+
+def store(cache_dir, key, max_bytes, collection=None, objects=()):
+    """Writes the finished import (a collection or loose objects) into the cache."""
+    file_name = f"{key}.blend"
+    path = os.path.join(cache_dir, file_name)
+    datablocks = {collection} if collection else set(objects)
+    bpy.data.libraries.write(path, datablocks, path_remap='ABSOLUTE', compress=True)
+
+    index = load_index(cache_dir)
+    index[key] = {
+        "file": file_name,
+        "collection": collection.name if collection else None,
+        "objects": [obj.name for obj in objects],
+        "size": os.path.getsize(path),
+        "last_used": time.time(),
+    }
+    removed = evict(cache_dir, index, max_bytes)
+    save_index(cache_dir, index, removed)
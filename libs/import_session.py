@@ -0,0 +1,89 @@
+import bpy
+
+# bpy.data collections an import session keeps track of
+TRACKED_DATA = ("objects", "meshes", "materials", "images", "armatures", "actions", "collections")
+
+def get_next_session_uid():
+    """Returns the session_uid the next created datablock will receive."""
+    # Blender hands out session_uids from a single counter that only ever grows,
+    # so creating and removing a throwaway datablock is enough to read it
+    marker = bpy.data.texts.new(".mt_session_marker")
+    session_uid = marker.session_uid
+    bpy.data.texts.remove(marker)
+    return session_uid + 1
+
+def is_alive(id_data):
+    try:
+        id_data.name
+        return True
+    except ReferenceError:
+        return False
+
+class ImportSession:
+    """Records exactly which datablocks were created while the session was active. Use as a context manager around the import."""
+
+    def __init__(self, tracked_data=TRACKED_DATA):
+        self.tracked_data = tracked_data
+        self.start_uid = None
+        self.end_uid = None
+        self.created = {}
+
+    def begin(self):
+        self.start_uid = get_next_session_uid()
+        self.end_uid = None
+        self.created = {}
+
+    def end(self):
+        """Collects the datablocks created since begin(). One pass over each tracked bpy.data collection."""
+        self.end_uid = get_next_session_uid()
+        for data_type in self.tracked_data:
+            self.created[data_type] = [
+                id_data for id_data in getattr(bpy.data, data_type)
+                if self.start_uid <= id_data.session_uid < self.end_uid
+            ]
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end()
+        return False
+
+    def get(self, data_type):
+        """Returns the datablocks of a type created during the session that still exist."""
+        created = [id_data for id_data in self.created.get(data_type, []) if is_alive(id_data)]
+        self.created[data_type] = created
+        return created
+
+    def owns(self, id_data):
+        """Whether a datablock was created during the session."""
+        return self.start_uid <= id_data.session_uid < self.end_uid
+
+    @property
+    def objects(self):
+        return self.get("objects")
+
+    @property
+    def meshes(self):
+        return self.get("meshes")
+
+    @property
+    def materials(self):
+        return self.get("materials")
+
+    @property
+    def images(self):
+        return self.get("images")
+
+    @property
+    def armatures(self):
+        return self.get("armatures")
+
+    @property
+    def actions(self):
+        return self.get("actions")
+
+    @property
+    def collections(self):
+        return self.get("collections")
@@ -0,0 +1,177 @@
+import bpy
+import os
+from bpy.app.handlers import persistent
+from collections import namedtuple
+
+TEMPLATE_PREFIX = ".mt_template."
+
+# The template datablocks only live for the session, so we keep names instead of references (undo invalidates references)
+TemplateEntry = namedtuple("TemplateEntry", ["mtime", "template_name", "original_names"])
+
+_templates = {}
+
+def template_is_valid(entry):
+    return bpy.data.collections.get(entry.template_name) is not None
+
+def collect_collection_tree(collection):
+    """Returns the collection and all of its child collections."""
+    collections = [collection]
+    for child in collection.children:
+        collections.extend(collect_collection_tree(child))
+    return collections
+
+def remove_template(entry):
+    """Removes all datablocks belonging to a cached template."""
+    template = bpy.data.collections.get(entry.template_name)
+    if not template:
+        return
+    collections = collect_collection_tree(template)
+    objects = set(template.all_objects)
+    datas = {obj.data for obj in objects if obj.data}
+    bpy.data.batch_remove(list(objects) + collections)
+    bpy.data.batch_remove([data for data in datas if data.users == 0])
+
+def load_template(file_path, collection_name):
+    """Appends the collection from the asset file once and renames it into hidden template datablocks."""
+    with bpy.data.libraries.load(file_path, link=False) as (data_from, data_to):
+        if collection_name not in data_from.collections:
+            return None
+        data_to.collections = [collection_name]
+
+    template = data_to.collections[0]
+    original_names = {}
+    for collection in collect_collection_tree(template):
+        original_names[TEMPLATE_PREFIX + collection.name] = collection_name if collection is template else collection.name
+        collection.name = TEMPLATE_PREFIX + collection.name
+    for obj in template.all_objects:
+        original_names[TEMPLATE_PREFIX + obj.name] = obj.name
+        obj.name = TEMPLATE_PREFIX + obj.name
+        if obj.data and not obj.data.name.startswith(TEMPLATE_PREFIX):
+            original_names[TEMPLATE_PREFIX + obj.data.name] = obj.data.name
+            obj.data.name = TEMPLATE_PREFIX + obj.data.name
+
+    return TemplateEntry(os.path.getmtime(file_path), template.name, original_names)
+
+def get_template(file_path, collection_name):
+    """Returns the cached template of a Mekrig collection, reloading it if the asset file changed."""
+    key = (file_path, collection_name)
+    mtime = os.path.getmtime(file_path)
+    entry = _templates.get(key)
+    if entry and entry.mtime == mtime and template_is_valid(entry):
+        return entry
+    if entry:
+        remove_template(entry)
+        del _templates[key]
+
+    entry = load_template(file_path, collection_name)
+    if entry:
+        _templates[key] = entry
+        print(f"[Mektools] Cached Mekrig template '{collection_name}'")
+    return entry
+
+# ID pointers that can reference other objects of the template
+MODIFIER_POINTERS = ("object", "target", "offset_object", "mirror_object", "start_cap", "end_cap")
+CONSTRAINT_POINTERS = ("target", "pole_target")
+
+def remap_attributes(struct, names, id_map):
+    """Points the given ID pointers of a struct that reference a template datablock to its copy."""
+    for name in names:
+        value = getattr(struct, name, None)
+        if isinstance(value, bpy.types.ID) and value in id_map:
+            setattr(struct, name, id_map[value])
+
+def remap_constraints(constraints, id_map):
+    for constraint in constraints:
+        remap_attributes(constraint, CONSTRAINT_POINTERS, id_map)
+        # Armature constraints keep their targets in a collection
+        for target in getattr(constraint, "targets", ()):
+            remap_attributes(target, ("target",), id_map)
+
+def remap_drivers(id_block, id_map):
+    animation_data = getattr(id_block, "animation_data", None)
+    if not animation_data:
+        return
+    for fcurve in animation_data.drivers:
+        for variable in fcurve.driver.variables:
+            for target in variable.targets:
+                if target.id in id_map:
+                    target.id = id_map[target.id]
+
+def remap_object(obj, id_map):
+    """Remaps the parent, modifier objects, constraint targets, custom shapes and driver variables of a copied object from the template to the new copies."""
+    remap_attributes(obj, ("parent",), id_map)
+    for modifier in obj.modifiers:
+        remap_attributes(modifier, MODIFIER_POINTERS, id_map)
+    remap_constraints(obj.constraints, id_map)
+    if obj.pose:
+        for pose_bone in obj.pose.bones:
+            remap_attributes(pose_bone, ("custom_shape",), id_map)
+            remap_constraints(pose_bone.constraints, id_map)
+    remap_drivers(obj, id_map)
+    if obj.data:
+        remap_drivers(obj.data, id_map)
+        # Shape key drivers live on the Key datablock of the mesh
+        shape_keys = getattr(obj.data, "shape_keys", None)
+        if shape_keys:
+            remap_drivers(shape_keys, id_map)
+
+def copy_collection(collection, id_map, original_names):
+    """Copies a template collection tree in memory. Objects shared between collections are copied once."""
+    new_collection = bpy.data.collections.new(original_names.get(collection.name, collection.name))
+    new_collection.color_tag = collection.color_tag
+    new_collection.hide_render = collection.hide_render
+    new_collection.hide_select = collection.hide_select
+    new_collection.hide_viewport = collection.hide_viewport
+
+    for obj in collection.objects:
+        new_obj = id_map.get(obj)
+        if new_obj is None:
+            new_obj = obj.copy()
+            new_obj.name = original_names.get(obj.name, obj.name)
+            id_map[obj] = new_obj
+            if obj.data:
+                new_data = id_map.get(obj.data)
+                if new_data is None:
+                    new_data = obj.data.copy()
+                    new_data.name = original_names.get(obj.data.name, obj.data.name)
+                    id_map[obj.data] = new_data
+                new_obj.data = new_data
+        new_collection.objects.link(new_obj)
+
+    for child in collection.children:
+        new_collection.children.link(copy_collection(child, id_map, original_names))
+
+    return new_collection
+
+def instantiate(file_path, collection_name):
+    """Creates a new, unlinked copy of a Mekrig collection from the session cache. Returns None if the collection does not exist."""
+    entry = get_template(file_path, collection_name)
+    if not entry:
+        return None
+
+    template = bpy.data.collections[entry.template_name]
+    id_map = {}
+    new_collection = copy_collection(template, id_map, entry.original_names)
+    for new_obj in set(id_map.values()):
+        if isinstance(new_obj, bpy.types.Object):
+            remap_object(new_obj, id_map)
+
+    return new_collection
+
+def clear_cache():
+    for entry in _templates.values():
+        remove_template(entry)
+    _templates.clear()
+
+@persistent
+def on_save_pre(*args):
+    """The templates are only a session cache, they must not end up in the user's .blend file."""
+    clear_cache()
+
+def register():
+    bpy.app.handlers.save_pre.append(on_save_pre)
+
+def unregister():
+    if on_save_pre in bpy.app.handlers.save_pre:
+        bpy.app.handlers.save_pre.remove(on_save_pre)
+    clear_cache()
@@ -0,0 +1,258 @@
+import bpy
+import numpy as np
+from collections import defaultdict
+from . import scene_index
+from .weight_analysis import read_vertex_weights
+
+# Attributes that are written through the mesh element API or are internal to Blender
+SKIPPED_ATTRIBUTES = {"position", "material_index", "sharp_face"}
+
+ATTRIBUTE_VALUE_KEYS = {
+    'FLOAT': "value",
+    'INT': "value",
+    'INT8': "value",
+    'BOOLEAN': "value",
+    'FLOAT_VECTOR': "vector",
+    'FLOAT2': "vector",
+    'INT32_2D': "value",
+    'FLOAT_COLOR': "color",
+    'BYTE_COLOR': "color",
+    'QUATERNION': "value",
+}
+
+ATTRIBUTE_DTYPES = {
+    'INT': np.int32,
+    'INT8': np.int32,
+    'BOOLEAN': bool,
+    'INT32_2D': np.int32,
+}
+
+ATTRIBUTE_WIDTHS = {
+    'FLOAT_VECTOR': 3,
+    'FLOAT2': 2,
+    'INT32_2D': 2,
+    'FLOAT_COLOR': 4,
+    'BYTE_COLOR': 4,
+    'QUATERNION': 4,
+}
+
+def read_array(collection, attr, width, dtype=np.float32):
+    """Reads an attribute of every item in a collection into a (n, width) array."""
+    array = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, array)
+    return array.reshape(-1, width) if width > 1 else array
+
+def transform_points(points, matrix):
+    """Applies a 4x4 matrix to a (n, 3) array of points."""
+    m = np.array(matrix, dtype=np.float32)
+    return points @ m[:3, :3].T + m[:3, 3]
+
+def transform_normals(normals, matrix):
+    """Applies the normal matrix of a 4x4 matrix to a (n, 3) array and renormalizes."""
+    m = np.array(matrix.to_3x3().inverted_safe().transposed(), dtype=np.float32)
+    normals = normals @ m.T
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    lengths[lengths == 0] = 1
+    return normals / lengths
+
+def get_attribute_layout(mesh, uv_names):
+    """Returns name -> (data_type, domain) for all generic attributes worth carrying over."""
+    layout = {}
+    for attribute in mesh.attributes:
+        name = attribute.name
+        if name.startswith(".") or name in SKIPPED_ATTRIBUTES or name in uv_names:
+            continue
+        if attribute.data_type not in ATTRIBUTE_VALUE_KEYS:
+            continue
+        layout[name] = (attribute.data_type, attribute.domain)
+    return layout
+
+def domain_size(mesh, domain):
+    if domain == 'POINT':
+        return len(mesh.vertices)
+    if domain == 'EDGE':
+        return len(mesh.edges)
+    if domain == 'FACE':
+        return len(mesh.polygons)
+    return len(mesh.loops)
+
+def read_attribute(mesh, name, data_type, domain):
+    """Reads a generic attribute, or returns zeros if the mesh does not have it."""
+    width = ATTRIBUTE_WIDTHS.get(data_type, 1)
+    dtype = ATTRIBUTE_DTYPES.get(data_type, np.float32)
+    attribute = mesh.attributes.get(name)
+    if attribute and attribute.data_type == data_type and attribute.domain == domain:
+        return read_array(attribute.data, ATTRIBUTE_VALUE_KEYS[data_type], width, dtype)
+    shape = (domain_size(mesh, domain), width) if width > 1 else domain_size(mesh, domain)
+    return np.zeros(shape, dtype=dtype)
+
+def write_vertex_weights(obj, vertex_indices, group_indices, weights):
+    """Writes vertex weights with one vertex_group.add call per group and exact weight instead of per vertex."""
+    weights = np.ascontiguousarray(weights, dtype=np.float32)
+    # Group index in the high bits, the float32 bit pattern of the weight in the low bits
+    keys = (group_indices.astype(np.int64) << 32) | weights.view(np.uint32).astype(np.int64)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    vertex_indices = vertex_indices[order]
+    weights = weights[order]
+    starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    ends = np.append(starts[1:], len(keys))
+    vertex_groups = obj.vertex_groups
+    for start, end in zip(starts, ends):
+        vertex_groups[int(keys[start] >> 32)].add(vertex_indices[start:end].tolist(), float(weights[start]), 'REPLACE')
+
+def merge_objects(objects):
+    """Merges all given mesh objects into the first one on data level. Returns the merged object."""
+    target = objects[0]
+    if len(objects) < 2:
+        return target
+
+    world_to_target = target.matrix_world.inverted()
+
+    materials = []
+    uv_names = []
+    vgroup_names = []
+    shape_key_names = []
+    shape_key_settings = {}
+    attribute_layout = {}
+    use_custom_normals = False
+    for obj in objects:
+        mesh = obj.data
+        for mat in mesh.materials:
+            if mat not in materials:
+                materials.append(mat)
+        for uv_layer in mesh.uv_layers:
+            if uv_layer.name not in uv_names:
+                uv_names.append(uv_layer.name)
+        for vgroup in obj.vertex_groups:
+            if vgroup.name not in vgroup_names:
+                vgroup_names.append(vgroup.name)
+        if mesh.shape_keys:
+            for key_block in mesh.shape_keys.key_blocks:
+                if key_block.name not in shape_key_names:
+                    shape_key_names.append(key_block.name)
+                    shape_key_settings[key_block.name] = (
+                        key_block.value, key_block.slider_min, key_block.slider_max, key_block.mute, key_block.relative_key.name
+                    )
+        use_custom_normals |= mesh.has_custom_normals
+    for obj in objects:
+        for name, layout in get_attribute_layout(obj.data, uv_names).items():
+            attribute_layout.setdefault(name, layout)
+
+    material_lookup = {mat: i for i, mat in enumerate(materials)}
+    vgroup_lookup = {name: i for i, name in enumerate(vgroup_names)}
+
+    coords, edges, loop_verts, loop_edges, loop_starts = [], [], [], [], []
+    poly_materials, poly_smooth, normals = [], [], []
+    uvs = defaultdict(list)
+    attributes = defaultdict(list)
+    shape_keys = defaultdict(list)
+    weights = []
+    vertex_offset = edge_offset = loop_offset = 0
+
+    for obj in objects:
+        mesh = obj.data
+        matrix = world_to_target @ obj.matrix_world
+
+        co = read_array(mesh.vertices, "co", 3)
+        coords.append(transform_points(co, matrix))
+        edges.append(read_array(mesh.edges, "vertices", 2, np.int32) + vertex_offset)
+        loop_verts.append(read_array(mesh.loops, "vertex_index", 1, np.int32) + vertex_offset)
+        loop_edges.append(read_array(mesh.loops, "edge_index", 1, np.int32) + edge_offset)
+        loop_starts.append(read_array(mesh.polygons, "loop_start", 1, np.int32) + loop_offset)
+        poly_smooth.append(read_array(mesh.polygons, "use_smooth", 1, bool))
+
+        # Remap material slots onto the merged material list
+        slot_lookup = np.array([material_lookup.get(mat, 0) for mat in mesh.materials] or [0], dtype=np.int32)
+        material_index = read_array(mesh.polygons, "material_index", 1, np.int32)
+        poly_materials.append(slot_lookup[np.clip(material_index, 0, len(slot_lookup) - 1)])
+
+        if use_custom_normals:
+            normals.append(transform_normals(read_array(mesh.corner_normals, "vector", 3), matrix))
+
+        for name in uv_names:
+            uv_layer = mesh.uv_layers.get(name)
+            uvs[name].append(read_array(uv_layer.data, "uv", 2) if uv_layer else np.zeros((len(mesh.loops), 2), dtype=np.float32))
+
+        for name, (data_type, domain) in attribute_layout.items():
+            attributes[name].append(read_attribute(mesh, name, data_type, domain))
+
+        # Meshes without a shape key contribute their basis coordinates
+        key_blocks = mesh.shape_keys.key_blocks if mesh.shape_keys else {}
+        for name in shape_key_names:
+            key_block = key_blocks.get(name)
+            shape_keys[name].append(transform_points(read_array(key_block.data, "co", 3), matrix) if key_block else coords[-1])
+
+        vertex_indices, group_indices, group_weights = read_vertex_weights(mesh)
+        if len(group_indices):
+            group_remap = np.array([vgroup_lookup[vg.name] for vg in obj.vertex_groups] or [0], dtype=np.int32)
+            weights.append((vertex_indices + vertex_offset, group_remap[group_indices], group_weights))
+
+        vertex_offset += len(mesh.vertices)
+        edge_offset += len(mesh.edges)
+        loop_offset += len(mesh.loops)
+
+    merged = bpy.data.meshes.new(target.data.name)
+    merged.vertices.add(vertex_offset)
+    merged.vertices.foreach_set("co", np.concatenate(coords).ravel())
+    merged.edges.add(edge_offset)
+    merged.edges.foreach_set("vertices", np.concatenate(edges).ravel())
+    merged.loops.add(loop_offset)
+    merged.loops.foreach_set("vertex_index", np.concatenate(loop_verts))
+    merged.loops.foreach_set("edge_index", np.concatenate(loop_edges))
+    merged.polygons.add(sum(len(starts) for starts in loop_starts))
+    merged.polygons.foreach_set("loop_start", np.concatenate(loop_starts))
+    merged.polygons.foreach_set("material_index", np.concatenate(poly_materials))
+    merged.polygons.foreach_set("use_smooth", np.concatenate(poly_smooth))
+
+    for mat in materials:
+        merged.materials.append(mat)
+
+    for name in uv_names:
+        uv_layer = merged.uv_layers.new(name=name)
+        uv_layer.data.foreach_set("uv", np.concatenate(uvs[name]).ravel())
+    active_uv = target.data.uv_layers.active
+    if active_uv and active_uv.name in merged.uv_layers:
+        merged.uv_layers.active = merged.uv_layers[active_uv.name]
+
+    for name, (data_type, domain) in attribute_layout.items():
+        attribute = merged.attributes.new(name, data_type, domain)
+        attribute.data.foreach_set(ATTRIBUTE_VALUE_KEYS[data_type], np.concatenate(attributes[name]).ravel())
+
+    merged.update()
+    if use_custom_normals:
+        merged.normals_split_custom_set(np.concatenate(normals))
+
+    # Swap the data of the target and drop the merged sources
+    old_meshes = [obj.data for obj in objects]
+    mesh_name = target.data.name
+    target.data = merged
+    for obj in objects[1:]:
+        bpy.data.objects.remove(obj)
+    scene_index.invalidate()
+    for mesh in set(old_meshes):
+        if mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    merged.name = mesh_name
+
+    for name in vgroup_names:
+        target.vertex_groups.new(name=name)
+    if weights:
+        write_vertex_weights(target, *(np.concatenate(arrays) for arrays in zip(*weights)))
+
+    for name in shape_key_names:
+        key_block = target.shape_key_add(name=name, from_mix=False)
+        key_block.data.foreach_set("co", np.concatenate(shape_keys[name]).ravel())
+    if shape_key_names:
+        key_blocks = target.data.shape_keys.key_blocks
+        for name in shape_key_names:
+            value, slider_min, slider_max, mute, relative_key = shape_key_settings[name]
+            key_block = key_blocks[name]
+            key_block.slider_min = slider_min
+            key_block.slider_max = slider_max
+            key_block.value = value
+            key_block.mute = mute
+            if relative_key in key_blocks:
+                key_block.relative_key = key_blocks[relative_key]
+
+    return target
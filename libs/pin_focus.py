@@ -0,0 +1,125 @@
+import bpy
+import json
+import numpy as np
+from . import scene_index
+
+# Custom property holding what a frozen character had enabled, so it can be restored after undo or a reload
+STATE_PROPERTY = "mt_pin_focus_state"
+
+def get_character_armature(obj):
+    """Returns the armature a pinned or active object belongs to."""
+    if obj is None:
+        return None
+    if obj.type == 'ARMATURE':
+        return obj
+    armature = obj.find_armature() if obj.type == 'MESH' else None
+    if armature is None and obj.parent and obj.parent.type == 'ARMATURE':
+        armature = obj.parent
+    return armature
+
+def is_frozen(armature):
+    return STATE_PROPERTY in armature
+
+def get_control_collections(armature):
+    """Direct child collections of the character's Mekrig collection that hold no armature and no mesh deformed by one, e.g. curves and widgets."""
+    collection = scene_index.get_collection(armature)
+    if collection is None:
+        return []
+    character_objects = {obj for users in scene_index.get_index().armature_users.values() for obj, _mod in users}
+    return [
+        child for child in collection.children
+        if not any(obj.type == 'ARMATURE' or obj in character_objects for obj in child.all_objects)
+    ]
+
+def freeze(armature):
+    """Disables evaluation of a character's armature modifiers, constraints and control collections. The previous state is stored on the armature."""
+    if is_frozen(armature):
+        return
+    state = {"modifiers": [], "bone_constraints": [], "object_constraints": [], "collections": []}
+
+    for obj, mod in scene_index.get_armature_users(armature):
+        state["modifiers"].append((obj.name, mod.name, mod.show_viewport))
+        mod.show_viewport = False
+
+    for bone in armature.pose.bones:
+        count = len(bone.constraints)
+        if not count:
+            continue
+        mutes = np.empty(count, dtype=bool)
+        bone.constraints.foreach_get("mute", mutes)
+        state["bone_constraints"].extend(
+            (bone.name, constraint.name, bool(mute)) for constraint, mute in zip(bone.constraints, mutes)
+        )
+        bone.constraints.foreach_set("mute", np.ones(count, dtype=bool))
+
+    for constraint in armature.constraints:
+        state["object_constraints"].append((constraint.name, constraint.mute))
+        constraint.mute = True
+
+    for collection in get_control_collections(armature):
+        state["collections"].append((collection.name, collection.hide_viewport))
+        collection.hide_viewport = True
+
+    armature[STATE_PROPERTY] = json.dumps(state)
+
+def thaw(armature):
+    """Restores exactly what freeze() disabled. Items that were renamed or deleted in the meantime are skipped."""
+    if not is_frozen(armature):
+        return
+    state = json.loads(armature[STATE_PROPERTY])
+    del armature[STATE_PROPERTY]
+
+    for obj_name, mod_name, show_viewport in state["modifiers"]:
+        obj = bpy.data.objects.get(obj_name)
+        mod = obj.modifiers.get(mod_name) if obj else None
+        if mod:
+            mod.show_viewport = show_viewport
+
+    bones = armature.pose.bones
+    for bone_name, constraint_name, mute in state["bone_constraints"]:
+        bone = bones.get(bone_name)
+        constraint = bone.constraints.get(constraint_name) if bone else None
+        if constraint:
+            constraint.mute = mute
+
+    for constraint_name, mute in state["object_constraints"]:
+        constraint = armature.constraints.get(constraint_name)
+        if constraint:
+            constraint.mute = mute
+
+    for collection_name, hide_viewport in state["collections"]:
+        collection = bpy.data.collections.get(collection_name)
+        if collection:
+            collection.hide_viewport = hide_viewport
+
+def get_pinned_armatures(scene):
+    armatures = []
+    for pin in scene.pins:
+        armature = get_character_armature(pin.object)
+        if armature and armature not in armatures:
+            armatures.append(armature)
+    return armatures
+
+def update_focus(scene, active_object=None):
+    """Freezes every pinned character except the one owning the active object. Without focus mode every character is restored."""
+    if not scene.pins_focus:
+        thaw_all()
+        return
+    active_armature = get_character_armature(active_object)
+    pinned = get_pinned_armatures(scene)
+    for armature in pinned:
+        if armature != active_armature:
+            freeze(armature)
+        else:
+            thaw(armature)
+    # Characters that were unpinned while frozen
+    thaw_all(exclude=pinned)
+
+def thaw_all(exclude=()):
+    """Restores every frozen character in the blend file."""
+    for obj in bpy.data.objects:
+        if obj.type == 'ARMATURE' and obj not in exclude and is_frozen(obj):
+            thaw(obj)
+
+def on_focus_changed(self, context):
+    update_focus(self, context.view_layer.objects.active)
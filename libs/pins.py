@@ -1,7 +1,16 @@
 import bpy
-from . import helper
+from bpy.app.handlers import persistent
+from . import helper, pin_focus
 suppress_pin_callback = False
 
+# Owner of the message bus subscriptions, and the object counts pins were last checked against
+_msgbus_owner = object()
+_object_counts = None
+# Pointers of the pinned objects focus mode was last applied to
+_pinned = None
+# View layer pointer and the pointers of its objects, read by the pin list on every redraw
+_view_layer_objects = (None, frozenset())
+
 def select_pin(self, context):
     """Updates selection based on selected pins index"""
     scene = context.scene
@@ -43,36 +52,128 @@ def sync_list_with_viewport_selection(scene):
     
     scene.suppress_pins = False                  
                 
+def is_ghost(obj):
+    """Whether a pinned object is missing from the view layer. The object pointers are cached until objects are added or removed."""
+    global _view_layer_objects
+    if obj is None:
+        return True
+    view_layer = bpy.context.view_layer
+    view_layer_pointer, pointers = _view_layer_objects
+    if view_layer_pointer != view_layer.as_pointer():
+        pointers = frozenset(layer_obj.as_pointer() for layer_obj in view_layer.objects)
+        _view_layer_objects = (view_layer.as_pointer(), pointers)
+    return obj.as_pointer() not in pointers
+
+def invalidate_ghosts():
+    global _view_layer_objects
+    _view_layer_objects = (None, frozenset())
+
 def cleanup_pin_list(scene):
     """Removes pins from the list if the object is no longer in the viewport.""" 
     to_remove = []
     
     for i, pin in enumerate(scene.pins):
-        if pin.object and pin.object not in bpy.context.view_layer.objects.values():
+        if pin.object and is_ghost(pin.object):
             to_remove.append(i)  
     
     for i in reversed(to_remove):
         scene.pins.remove(i)
-        
-
-def on_update_callback(scene):
-    """Callback function triggered when Blender's update operation is called."""
-    remove_callback()  # Temporarily disable callback
-    sync_list_with_viewport_selection(scene) 
-    cleanup_pin_list(scene)
-    add_callback()  # Re-enable callback
-    
-def add_callback():
-    """Ensures the callback is only added once."""
-    
-    if on_update_callback not in bpy.app.handlers.depsgraph_update_post:
-        bpy.app.handlers.depsgraph_update_post.append(on_update_callback)
 
-def remove_callback():
-    """Removes the callback to prevent infinite recursion."""
-    
-    if on_update_callback in bpy.app.handlers.depsgraph_update_post:
-        bpy.app.handlers.depsgraph_update_post.remove(on_update_callback)
+def on_pins_changed(scene):
+    """Re-applies focus mode when pins were added or removed. Called by pin operators, the message bus and the depsgraph handler when object counts change."""
+    global _pinned
+    pinned = tuple(pin.object.as_pointer() if pin.object else 0 for pin in scene.pins)
+    if pinned == _pinned:
+        return
+    _pinned = pinned
+    if scene.pins_focus:
+        pin_focus.update_focus(scene, bpy.context.view_layer.objects.active)
+
+def on_pin_list_changed():
+    """Message bus callback for edits of the pin list."""
+    scene = bpy.context.scene
+    if scene and hasattr(scene, "pins"):
+        on_pins_changed(scene)
 
+def on_active_object_changed():
+    """Message bus callback, runs only when the active object of the view layer changes."""
+    scene = bpy.context.scene
+    if scene and hasattr(scene, "pins"):
+        sync_list_with_viewport_selection(scene)
+        if scene.pins_focus:
+            pin_focus.update_focus(scene, bpy.context.view_layer.objects.active)
 
-        
\ No newline at end of file
+def get_object_counts():
+    view_layer = bpy.context.view_layer
+    return len(bpy.data.objects), len(view_layer.objects) if view_layer else 0
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    """Cleans up pins only when objects were added to or removed from the blend file or view layer, not on every transform."""
+    global _object_counts
+    counts = get_object_counts()
+    if counts == _object_counts:
+        return
+    _object_counts = counts
+    invalidate_ghosts()
+    if hasattr(scene, "pins") and len(scene.pins):
+        cleanup_pin_list(scene)
+        on_pins_changed(scene)
+
+@persistent
+def on_undo(*args):
+    global _object_counts, _pinned
+    _object_counts = None
+    _pinned = None
+    invalidate_ghosts()
+
+@persistent
+def on_file_load(*args):
+    """Message bus subscriptions do not survive loading a file."""
+    on_undo()
+    subscribe()
+    scene = bpy.context.scene
+    if scene and hasattr(scene, "pins"):
+        sync_list_with_viewport_selection(scene)
+
+def subscribe():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.LayerObjects, "active"),
+        owner=_msgbus_owner,
+        args=(),
+        notify=on_active_object_changed,
+    )
+    bpy.msgbus.subscribe_rna(
+        key=(bpy.types.Scene, "pins"),
+        owner=_msgbus_owner,
+        args=(),
+        notify=on_pin_list_changed,
+    )
+
+def get_handlers():
+    return (
+        (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+        (bpy.app.handlers.load_post, on_file_load),
+        (bpy.app.handlers.undo_post, on_undo),
+        (bpy.app.handlers.redo_post, on_undo),
+    )
+
+def add_callback():
+    """Starts pin tracking. Handlers are only added once."""
+    subscribe()
+    for handlers, handler in get_handlers():
+        if handler not in handlers:
+            handlers.append(handler)
+
+def remove_callback():
+    """Stops pin tracking. Frozen characters are restored first, nothing would thaw them afterwards."""
+    global _object_counts, _pinned
+    pin_focus.thaw_all()
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    for handlers, handler in get_handlers():
+        if handler in handlers:
+            handlers.remove(handler)
+    _object_counts = None
+    _pinned = None
+    invalidate_ghosts()
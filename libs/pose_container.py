@@ -0,0 +1,103 @@
+import json
+import struct
+import numpy as np
+
+# Binary pose container:
+#   header:  magic, version, pose count, bone count, table length
+#   table:   utf-8 JSON with the bone names, pose names and file header, padded to DATA_ALIGNMENT
+#   data:    float32 positions (poses, bones, 3), rotations XYZW (poses, bones, 4), scales (poses, bones, 3)
+# Channels that were not saved for a bone are NaN.
+MAGIC = b"MKPOSE\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIII")
+DATA_ALIGNMENT = 16
+CHANNEL_WIDTHS = (("positions", 3), ("rotations", 4), ("scales", 3))
+
+def is_container(filepath):
+    """Checks the magic bytes, so containers can share the .pose extension with JSON files."""
+    with open(filepath, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def get_data_offset(table_length):
+    offset = HEADER.size + table_length
+    return offset + (DATA_ALIGNMENT - offset % DATA_ALIGNMENT) % DATA_ALIGNMENT
+
+class PoseContainer:
+    """Read only view of a binary pose container. The pose data is memory mapped, only touched poses are read from disk."""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, 'rb') as f:
+            magic, version, pose_count, bone_count, table_length = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a Mektools pose container: {filepath}")
+            if version > VERSION:
+                raise ValueError(f"Pose container version {version} is newer than supported version {VERSION}")
+            table = json.loads(f.read(table_length).decode('utf-8'))
+
+        self.bone_names = table["bones"]
+        self.pose_names = table.get("poses", [])
+        self.header = table.get("header", {})
+        if len(self.bone_names) != bone_count:
+            raise ValueError(f"Bone table of {filepath} does not match its header")
+
+        offset = get_data_offset(table_length)
+        self.channels = {}
+        for name, width in CHANNEL_WIDTHS:
+            shape = (pose_count, bone_count, width)
+            if pose_count and bone_count:
+                self.channels[name] = np.memmap(filepath, dtype='<f4', mode='r', offset=offset, shape=shape)
+            else:
+                self.channels[name] = np.empty(shape, dtype='<f4')
+            offset += pose_count * bone_count * width * 4
+
+    def __len__(self):
+        return self.channels["positions"].shape[0]
+
+    def get_pose(self, index):
+        """Returns (positions, XYZW rotations, scales) arrays of one pose."""
+        return tuple(np.asarray(self.channels[name][index]) for name, _width in CHANNEL_WIDTHS)
+
+class ContainerWriter:
+    """Writes a binary pose container one pose at a time, the pose count has to be known up front."""
+
+    def __init__(self, filepath, bone_names, pose_count, pose_names=None, header=None):
+        self.filepath = filepath
+        self.bone_count = len(bone_names)
+        self.pose_count = pose_count
+        table = json.dumps({"bones": list(bone_names), "poses": list(pose_names or []), "header": header or {}}, separators=(",", ":")).encode('utf-8')
+        data_offset = get_data_offset(len(table))
+        data_size = pose_count * self.bone_count * sum(width for _name, width in CHANNEL_WIDTHS) * 4
+
+        with open(filepath, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, pose_count, self.bone_count, len(table)))
+            f.write(table)
+            f.write(b"\0" * (data_offset - HEADER.size - len(table)))
+            f.truncate(data_offset + data_size)
+
+        self.channels = {}
+        offset = data_offset
+        for name, width in CHANNEL_WIDTHS:
+            shape = (pose_count, self.bone_count, width)
+            if pose_count and self.bone_count:
+                self.channels[name] = np.memmap(filepath, dtype='<f4', mode='r+', offset=offset, shape=shape)
+            offset += pose_count * self.bone_count * width * 4
+
+    def write_pose(self, index, positions=None, rotations=None, scales=None):
+        """Writes one pose. Missing channels are stored as NaN."""
+        if not self.channels:
+            return
+        for (name, width), values in zip(CHANNEL_WIDTHS, (positions, rotations, scales)):
+            self.channels[name][index] = np.nan if values is None else values
+
+    def close(self):
+        for channel in self.channels.values():
+            channel.flush()
+        self.channels.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,301 @@
+import json
+import os
+import numpy as np
+from collections import OrderedDict
+from mathutils import Matrix, Quaternion, Vector
+from . import pose_container, pose_io
+from .bone_index import get_bone_index, strip_suffix
+
+# Parsed .pose files, keyed by filepath and invalidated by mtime. Least recently used files are dropped first
+_pose_file_cache = OrderedDict()
+POSE_FILE_CACHE_SIZE = 256
+
+def parse_channel(value):
+    """Parses a "x, y, z" channel string into a tuple of floats."""
+    return tuple(float(x) for x in value.split(","))
+
+def parse_pose_bones(bones):
+    """Converts the 'Bones' dict of a .pose file into Position/Rotation/Scale channels. Rotation is stored as Quaternion (WXYZ)."""
+    parsed = {}
+    for bone_name, trans in bones.items():
+        channels = {}
+        try:
+            if "Position" in trans:
+                channels["Position"] = Vector(parse_channel(trans["Position"]))
+            if "Rotation" in trans:
+                x, y, z, w = parse_channel(trans["Rotation"])  # Convert XYZW to WXYZ
+                channels["Rotation"] = Quaternion((w, x, y, z))
+            if "Scale" in trans:
+                channels["Scale"] = Vector(parse_channel(trans["Scale"]))
+        except (ValueError, AttributeError) as e:
+            print(f"[Mektools] Skipping malformed bone '{bone_name}': {e}")
+            continue
+        parsed[bone_name] = channels
+    return parsed
+
+def parse_pose_document(data):
+    """Splits a loaded .pose JSON document into (header, list of poses). Single pose files contain one pose."""
+    header = {key: value for key, value in data.items() if key not in ("Bones", "Frames")}
+    if "Frames" in data:
+        poses = [parse_pose_bones(frame['Bones']) for frame in data['Frames']]
+    else:
+        poses = [parse_pose_bones(data['Bones'])]
+    return header, poses
+
+class ContainerPoses:
+    """Sequence of the poses of a binary container. Poses are converted to channels on first access."""
+
+    def __init__(self, container):
+        self.container = container
+        self.bone_names = container.bone_names
+        self.converted = {}
+
+    def __len__(self):
+        return len(self.container)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Pose index {index} out of range")
+        pose = self.converted.get(index)
+        if pose is None:
+            pose = self.converted[index] = convert_container_pose(self.container, index)
+        return pose
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+def convert_container_pose(container, index):
+    """Converts one pose of a binary container into Position/Rotation/Scale channels, skipping NaN channels."""
+    positions, rotations, scales = container.get_pose(index)
+    has_position = ~np.isnan(positions).any(axis=1)
+    has_rotation = ~np.isnan(rotations).any(axis=1)
+    has_scale = ~np.isnan(scales).any(axis=1)
+
+    pose = {}
+    for i, bone_name in enumerate(container.bone_names):
+        channels = {}
+        if has_position[i]:
+            channels["Position"] = Vector(positions[i].tolist())
+        if has_rotation[i]:
+            x, y, z, w = rotations[i].tolist()  # Convert XYZW to WXYZ
+            channels["Rotation"] = Quaternion((w, x, y, z))
+        if has_scale[i]:
+            channels["Scale"] = Vector(scales[i].tolist())
+        if channels:
+            pose[bone_name] = channels
+    return pose
+
+def get_pose_bone_names(poses):
+    """Returns every bone name used by a list of poses without converting container poses."""
+    if isinstance(poses, ContainerPoses):
+        return frozenset(poses.bone_names)
+    return frozenset(bone for pose in poses for bone in pose)
+
+def load_pose_document(filepath):
+    """Reads a JSON or binary .pose file without the cache. Returns (header, list of poses)."""
+    if pose_container.is_container(filepath):
+        container = pose_container.PoseContainer(filepath)
+        return container.header, ContainerPoses(container)
+    with open(filepath, 'r') as f:
+        return parse_pose_document(json.load(f))
+
+def cache_pose_document(filepath, mtime, document):
+    _pose_file_cache[filepath] = (mtime, document)
+    _pose_file_cache.move_to_end(filepath)
+    while len(_pose_file_cache) > POSE_FILE_CACHE_SIZE:
+        _pose_file_cache.popitem(last=False)
+
+def forget_pose_file(filepath):
+    """Drops a file from the cache, releasing its memory map before the file gets overwritten."""
+    _pose_file_cache.pop(filepath, None)
+
+def read_pose_document(filepath):
+    """Reads and parses a .pose file once. Returns (header, list of poses)."""
+    mtime = os.path.getmtime(filepath)
+    cached = _pose_file_cache.get(filepath)
+    if cached and cached[0] == mtime:
+        _pose_file_cache.move_to_end(filepath)
+        return cached[1]
+
+    document = load_pose_document(filepath)
+    cache_pose_document(filepath, mtime, document)
+    return document
+
+def read_pose_sequence(filepath):
+    """Returns every pose of a .pose file."""
+    return read_pose_document(filepath)[1]
+
+def read_pose_file(filepath, pose_index=0):
+    """Returns a dict of bone name -> channels for one pose of a .pose file."""
+    return read_pose_sequence(filepath)[pose_index]
+
+def clear_pose_file_cache():
+    _pose_file_cache.clear()
+
+def get_bones_parent_first(armature):
+    """Returns all pose bones ordered so every parent comes before its children."""
+    sorted_bones = []
+
+    def collect_bones_recursive(bone):
+        sorted_bones.append(bone)
+        for child in bone.children:
+            collect_bones_recursive(child)
+
+    for bone in armature.pose.bones:
+        if bone.parent is None:
+            collect_bones_recursive(bone)
+    return sorted_bones
+
+def get_root_diff(root_bone):
+    """Resets the root bone and returns its orientation diff as (axis, angle)."""
+    root_bone.matrix_basis = Matrix()
+    aa = Quaternion([1, 0, 0, 0]).rotation_difference(root_bone.matrix.to_quaternion()).to_axis_angle()
+    return [aa[0][0], aa[0][1], aa[0][2], aa[1]]
+
+def get_rest_offset(pose_bone, pose_matrices):
+    """Returns the pose space matrix of a bone with an identity basis, using already computed parent matrices."""
+    bone = pose_bone.bone
+    if pose_bone.parent is None:
+        return bone.matrix_local.copy()
+    parent_matrix = pose_matrices.get(pose_bone.parent.name)
+    if parent_matrix is None:
+        parent_matrix = pose_bone.parent.matrix
+    return parent_matrix @ bone.parent.matrix_local.inverted() @ bone.matrix_local
+
+def compute_local_rotations(armature, pose, diff, bone_index=None):
+    """Converts the pose space rotations of a parsed pose into local rotations in one parent-first pass. Returns (bone name -> Quaternion, bone name -> pose matrix)."""
+    if bone_index is None:
+        bone_index = get_bone_index(armature)
+    diff_quat = Quaternion(diff[:3], diff[3])
+
+    targets = {}
+    for canonical_name, channels in pose.items():
+        index = bone_index.find(canonical_name)
+        if index is not None and "Rotation" in channels:
+            targets[bone_index.names[index]] = channels["Rotation"] @ diff_quat
+
+    rotations = {}
+    pose_matrices = {}
+    for pose_bone in get_bones_parent_first(armature):
+        offset = get_rest_offset(pose_bone, pose_matrices)
+        target = targets.get(pose_bone.name)
+        if target is not None:
+            rotation = offset.to_quaternion().inverted() @ target
+            rotations[pose_bone.name] = rotation
+            basis = Matrix.LocRotScale(pose_bone.location, rotation, pose_bone.scale)
+        else:
+            basis = pose_bone.matrix_basis
+        pose_matrices[pose_bone.name] = offset @ basis
+
+    return rotations, pose_matrices
+
+def apply_pose(armature, pose, diff, bone_index=None):
+    """Applies every rotation of a parsed pose onto the armature in one pass. Returns the computed pose matrices."""
+    if bone_index is None:
+        bone_index = get_bone_index(armature)
+    rotations, pose_matrices = compute_local_rotations(armature, pose, diff, bone_index)
+    if rotations:
+        indices = [bone_index.index(bone_name) for bone_name in rotations]
+        pose_io.write_channel(armature, "rotation_quaternion", [tuple(rotation) for rotation in rotations.values()], indices)
+    print(f"[Mektools] Applied rotations to {len(rotations)} bones.")
+    return pose_matrices
+
+def read_pose_matrices(armature):
+    """Reads the pose space matrix of every pose bone in one call. Returns a (n, 4, 4) array."""
+    bones = armature.pose.bones
+    matrices = np.empty(len(bones) * 16, dtype=np.float64)
+    bones.foreach_get("matrix", matrices)
+    # foreach_get returns the matrices column major
+    return matrices.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+def matrices_to_quaternions(matrices):
+    """Converts a (n, 3, 3) array of normalized rotation matrices into (n, 4) WXYZ quaternions with positive W."""
+    m = matrices
+    quats = np.empty((len(m), 4), dtype=np.float64)
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+
+    cases = (
+        trace > 0,
+        (m[:, 0, 0] > m[:, 1, 1]) & (m[:, 0, 0] > m[:, 2, 2]),
+        m[:, 1, 1] > m[:, 2, 2],
+        np.ones(len(m), dtype=bool),
+    )
+    remaining = np.ones(len(m), dtype=bool)
+    for case, mask in enumerate(cases):
+        mask = mask & remaining
+        remaining &= ~mask
+        if not mask.any():
+            continue
+        c = m[mask]
+        if case == 0:
+            s = np.sqrt(trace[mask] + 1.0) * 2
+            q = (0.25 * s, (c[:, 2, 1] - c[:, 1, 2]) / s, (c[:, 0, 2] - c[:, 2, 0]) / s, (c[:, 1, 0] - c[:, 0, 1]) / s)
+        elif case == 1:
+            s = np.sqrt(1.0 + c[:, 0, 0] - c[:, 1, 1] - c[:, 2, 2]) * 2
+            q = ((c[:, 2, 1] - c[:, 1, 2]) / s, 0.25 * s, (c[:, 0, 1] + c[:, 1, 0]) / s, (c[:, 0, 2] + c[:, 2, 0]) / s)
+        elif case == 2:
+            s = np.sqrt(1.0 + c[:, 1, 1] - c[:, 0, 0] - c[:, 2, 2]) * 2
+            q = ((c[:, 0, 2] - c[:, 2, 0]) / s, (c[:, 0, 1] + c[:, 1, 0]) / s, 0.25 * s, (c[:, 1, 2] + c[:, 2, 1]) / s)
+        else:
+            s = np.sqrt(1.0 + c[:, 2, 2] - c[:, 0, 0] - c[:, 1, 1]) * 2
+            q = ((c[:, 1, 0] - c[:, 0, 1]) / s, (c[:, 0, 2] + c[:, 2, 0]) / s, (c[:, 1, 2] + c[:, 2, 1]) / s, 0.25 * s)
+        quats[mask] = np.stack(q, axis=1)
+
+    quats /= np.linalg.norm(quats, axis=1, keepdims=True)
+    quats[quats[:, 0] < 0] *= -1
+    return quats
+
+def decompose_matrices(matrices):
+    """Splits a (n, 4, 4) array into (translations, WXYZ rotations, scales), matching Matrix.decompose."""
+    translations = matrices[:, :3, 3]
+    basis = matrices[:, :3, :3]
+    scales = np.linalg.norm(basis, axis=1)
+    safe_scales = np.where(scales == 0, 1.0, scales)
+    rotations = basis / safe_scales[:, np.newaxis, :]
+    # A negative determinant means a mirrored axis, flip it so the rotation stays proper
+    negative = np.linalg.det(rotations) < 0
+    rotations[negative] *= -1
+    return translations, matrices_to_quaternions(rotations), scales
+
+def get_relative_transforms(armature, bone_names, root_name="n_throw"):
+    """Computes root relative (translations, WXYZ rotations, scales) of the given pose bones in one pass."""
+    bone_lookup = get_bone_index(armature).by_name
+    matrices = read_pose_matrices(armature)
+    # The armature world matrix cancels out between root and bone
+    root_inverse = np.linalg.inv(matrices[bone_lookup[root_name]])
+    relative = root_inverse @ matrices[[bone_lookup[name] for name in bone_names]]
+    return decompose_matrices(relative)
+
+def format_pose_bones(bone_names, transforms, save_position=True, save_rotation=True, save_scale=True):
+    """Formats root relative transforms into the 'Bones' dict of a .pose file."""
+    translations, rotations, scales = transforms
+    bones = {}
+    for i, bone_name in enumerate(bone_names):
+        bone_data = {}
+        if save_position:
+            bone_data["Position"] = "{:.6f}, {:.6f}, {:.6f}".format(*translations[i])
+        if save_rotation:
+            w, x, y, z = rotations[i]
+            bone_data["Rotation"] = f"{x:.6f}, {y:.6f}, {z:.6f}, {w:.6f}"
+        if save_scale:
+            bone_data["Scale"] = "{:.8f}, {:.8f}, {:.8f}".format(*scales[i])
+        bones[strip_suffix(bone_name)] = bone_data
+    return bones
+
+def get_container_bone_order(bone_names):
+    """Returns suffix-stripped name -> index into bone_names. Later bones win on collisions, same as the JSON 'Bones' dict."""
+    return {strip_suffix(bone_name): i for i, bone_name in enumerate(bone_names)}
+
+def get_container_channels(bone_names, transforms, save_position=True, save_rotation=True, save_scale=True):
+    """Converts root relative transforms into (names, positions, XYZW rotations, scales) for a binary container. Unsaved channels are None."""
+    translations, rotations, scales = transforms
+    order = get_container_bone_order(bone_names)
+    indices = list(order.values())
+    return (
+        list(order),
+        translations[indices] if save_position else None,
+        rotations[indices][:, [1, 2, 3, 0]] if save_rotation else None,
+        scales[indices] if save_scale else None,
+    )
@@ -0,0 +1,84 @@
+import numpy as np
+from . import data_registry
+from .bone_index import get_bone_index
+
+# Pose bone transform channels with their width and rest value
+CHANNELS = {
+    "location": (3, (0.0, 0.0, 0.0)),
+    "rotation_quaternion": (4, (1.0, 0.0, 0.0, 0.0)),
+    "rotation_euler": (3, (0.0, 0.0, 0.0)),
+    "scale": (3, (1.0, 1.0, 1.0)),
+}
+# Channels the pose reset operators clear
+RESET_CHANNELS = ("location", "rotation_quaternion", "scale")
+
+def get_bone_names(armature):
+    return list(get_bone_index(armature).names)
+
+def read_channel(armature, name):
+    """Returns one channel of all pose bones as a (bones, width) array."""
+    bones = armature.pose.bones
+    width, _rest = CHANNELS[name]
+    values = np.empty(len(bones) * width, dtype=np.float32)
+    bones.foreach_get(name, values)
+    return values.reshape(-1, width)
+
+def read_channels(armature, names=CHANNELS):
+    return {name: read_channel(armature, name) for name in names}
+
+def write_channel(armature, name, values, mask=None):
+    """Writes one channel of all pose bones. With a boolean mask or index array only those bones change, values then holds their rows."""
+    if mask is not None:
+        current = read_channel(armature, name)
+        current[mask] = values
+        values = current
+    armature.pose.bones.foreach_set(name, np.ascontiguousarray(values, dtype=np.float32).ravel())
+
+def write_channels(armature, channels, mask=None):
+    for name, values in channels.items():
+        write_channel(armature, name, values, mask)
+
+def reset_channels(armature, mask=None, names=RESET_CHANNELS):
+    """Sets the given channels back to their rest values, for all bones or the masked ones."""
+    bone_count = len(armature.pose.bones)
+    for name in names:
+        width, rest = CHANNELS[name]
+        if mask is None:
+            write_channel(armature, name, np.tile(np.asarray(rest, dtype=np.float32), (bone_count, 1)))
+        else:
+            write_channel(armature, name, rest, mask)
+
+def get_mask(armature, bone_names):
+    """Returns a boolean mask over the pose bones that is set for every given bone name."""
+    index = get_bone_index(armature)
+    mask = np.zeros(len(index), dtype=bool)
+    mask[[i for i in map(index.index, bone_names) if i is not None]] = True
+    return mask
+
+def get_selection_mask(armature):
+    bones = armature.pose.bones
+    return np.fromiter((bone.bone.select for bone in bones), dtype=bool, count=len(bones))
+
+def get_group_masks(armature):
+    """Returns group name -> mask over the pose bones. Computed once per bone layout, hair also gets every j_ex bone."""
+    index = get_bone_index(armature)
+    masks = index.masks.get("groups")
+    if masks is None:
+        masks = {}
+        for group, group_bones in data_registry.get_bone_groups().items():
+            mask = np.zeros(len(index), dtype=bool)
+            mask[[i for i in map(index.index, group_bones) if i is not None]] = True
+            masks[group] = mask
+        if "Hair" in masks:
+            masks["Hair"] |= np.fromiter((name.startswith("j_ex") for name in index.names), dtype=bool, count=len(index))
+        index.masks["groups"] = masks
+    return masks
+
+def get_groups_mask(armature, groups):
+    """Combines the masks of several bone groups."""
+    masks = get_group_masks(armature)
+    mask = np.zeros(len(armature.pose.bones), dtype=bool)
+    for group in groups:
+        if group in masks:
+            mask |= masks[group]
+    return mask
@@ -0,0 +1,154 @@
+import json
+import os
+import struct
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from . import pose_engine, data_registry
+
+INDEX_VERSION = 1
+INDEX_FILE = "pose_library.json"
+
+PoseEntry = namedtuple("PoseEntry", ["path", "name", "mtime", "size", "file_version", "pose_count", "bones", "groups"])
+
+# The library of the last scan: folder and relative path -> PoseEntry
+_library = {"folder": None, "entries": {}}
+def get_groups_present(bone_names):
+    """Returns the sorted export groups that have at least one bone in the pose."""
+    bone_groups = data_registry.get_bone_group_lookup()
+    groups = set()
+    for bone_name in bone_names:
+        groups.update(bone_groups.get(bone_name, ()))
+        if bone_name.startswith("j_ex"):
+            groups.add("Hair")
+    return sorted(groups)
+
+def find_pose_files(folder):
+    """Returns the relative paths of every .pose file below folder."""
+    paths = []
+    for root, _dirs, files in os.walk(folder):
+        for file in files:
+            if file.lower().endswith(".pose"):
+                paths.append(os.path.relpath(os.path.join(root, file), folder))
+    return paths
+
+def parse_file(path):
+    """Runs in a worker thread. Returns (mtime, size, file version, pose count, bone names) or the exception that was raised. The parsed document is dropped here."""
+    try:
+        stat = os.stat(path)
+        header, poses = pose_engine.load_pose_document(path)
+        return stat.st_mtime, stat.st_size, header.get("FileVersion", 0), len(poses), pose_engine.get_pose_bone_names(poses)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, struct.error) as e:
+        return e
+
+def load_index(index_path, folder):
+    """Loads the cached index. Bone sets are stored as indices into a shared name table to keep the file small."""
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[Mektools] Pose library index is unreadable, rescanning: {e}")
+        return {}
+    if data.get("version") != INDEX_VERSION or data.get("folder") != folder:
+        return {}
+
+    bone_names = data["bone_names"]
+    entries = {}
+    for rel_path, item in data["files"].items():
+        entries[rel_path] = PoseEntry(
+            path=os.path.join(folder, rel_path),
+            name=os.path.splitext(os.path.basename(rel_path))[0],
+            mtime=item["mtime"],
+            size=item["size"],
+            file_version=item["file_version"],
+            pose_count=item["pose_count"],
+            bones=frozenset(bone_names[i] for i in item["bones"]),
+            groups=tuple(item["groups"]),
+        )
+    return entries
+
+def save_index(index_path, folder, entries):
+    bone_names = sorted({bone for entry in entries.values() for bone in entry.bones})
+    bone_lookup = {name: i for i, name in enumerate(bone_names)}
+    data = {
+        "version": INDEX_VERSION,
+        "folder": folder,
+        "bone_names": bone_names,
+        "files": {
+            rel_path: {
+                "mtime": entry.mtime,
+                "size": entry.size,
+                "file_version": entry.file_version,
+                "pose_count": entry.pose_count,
+                "bones": sorted(bone_lookup[bone] for bone in entry.bones),
+                "groups": list(entry.groups),
+            }
+            for rel_path, entry in entries.items()
+        },
+    }
+    temp_path = index_path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(temp_path, index_path)
+
+def is_unchanged(entry, path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return entry.mtime == stat.st_mtime and entry.size == stat.st_size
+
+def scan(folder, index_dir, workers=None):
+    """Indexes every .pose file below folder. Only files that changed since the cached index are parsed again. Returns relative path -> PoseEntry."""
+    folder = os.path.normpath(folder)
+    index_path = os.path.join(index_dir, INDEX_FILE)
+    cached = load_index(index_path, folder)
+
+    entries = {}
+    changed = []
+    for rel_path in find_pose_files(folder):
+        entry = cached.get(rel_path)
+        if entry and is_unchanged(entry, entry.path):
+            entries[rel_path] = entry
+        else:
+            changed.append(rel_path)
+
+    if changed:
+        paths = [os.path.join(folder, rel_path) for rel_path in changed]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(parse_file, paths))
+
+        # Only the compact entry is kept, a pose is parsed through the bounded parse cache when it is applied
+        for rel_path, path, result in zip(changed, paths, results):
+            if isinstance(result, Exception):
+                print(f"[Mektools] Skipping unreadable pose file '{path}': {result}")
+                continue
+            mtime, size, file_version, pose_count, bones = result
+            entries[rel_path] = PoseEntry(
+                path=path,
+                name=os.path.splitext(os.path.basename(rel_path))[0],
+                mtime=mtime,
+                size=size,
+                file_version=file_version,
+                pose_count=pose_count,
+                bones=bones,
+                groups=tuple(get_groups_present(bones)),
+            )
+
+    if changed or len(entries) != len(cached):
+        try:
+            save_index(index_path, folder, entries)
+        except OSError as e:
+            print(f"[Mektools] Failed to write pose library index: {e}")
+    print(f"[Mektools] Pose library: {len(entries)} files, {len(changed)} parsed.")
+
+    _library["folder"] = folder
+    _library["entries"] = entries
+    return entries
+
+def get_entries():
+    return _library["entries"]
+
+def get_entry(rel_path):
+    return _library["entries"].get(rel_path)
@@ -0,0 +1,98 @@
+import bpy
+import numpy as np
+from . import pose_io
+
+# Pose bone channels that get keyed, with their width and rest value
+CHANNELS = (
+    ("location", 3, 0.0),
+    ("rotation_quaternion", 4, (1.0, 0.0, 0.0, 0.0)),
+    ("rotation_euler", 3, 0.0),
+    ("scale", 3, 1.0),
+)
+INTERPOLATION_MODES = {'CONSTANT': 0, 'LINEAR': 1, 'BEZIER': 2}
+TOLERANCE = 1e-6
+
+def make_quaternions_continuous(values):
+    """Flips the sign of quaternions in a (frames, 4) array so each one lies in the same hemisphere as the previous frame. q and -q are the same rotation, but interpolating between them spins the long way round."""
+    if len(values) < 2:
+        return values
+    flips = np.einsum("ij,ij->i", values[1:], values[:-1]) < 0
+    signs = np.where(np.concatenate(([0], np.cumsum(flips))) % 2, -1.0, 1.0).astype(values.dtype)
+    return values * signs[:, None]
+
+class ChannelRecorder:
+    """Collects the transform channels of every pose bone for a fixed number of frames."""
+
+    def __init__(self, armature, frame_count):
+        self.armature = armature
+        self.bone_names = [bone.name for bone in armature.pose.bones]
+        self.frames = np.zeros(frame_count, dtype=np.float32)
+        self.values = {
+            name: np.empty((frame_count, len(self.bone_names), width), dtype=np.float32)
+            for name, width, _rest in CHANNELS
+        }
+        self.count = 0
+
+    def record(self, frame):
+        """Reads the current pose of all bones with one foreach_get per channel."""
+        for name, _width, _rest in CHANNELS:
+            self.values[name][self.count] = pose_io.read_channel(self.armature, name)
+        self.frames[self.count] = frame
+        self.count += 1
+
+    def get_keyed_channels(self):
+        """Yields (bone index, channel name, values of shape (frames, width)) for every channel that leaves its rest value."""
+        rotation_modes = [bone.rotation_mode for bone in self.armature.pose.bones]
+        for name, width, rest in CHANNELS:
+            values = self.values[name][:self.count]
+            moved = (np.abs(values - np.asarray(rest, dtype=np.float32)) > TOLERANCE).any(axis=(0, 2))
+            for bone_index in np.flatnonzero(moved):
+                rotation_mode = rotation_modes[bone_index]
+                # Only key the rotation channel the bone actually uses
+                if name == "rotation_quaternion" and rotation_mode != 'QUATERNION':
+                    continue
+                if name == "rotation_euler" and rotation_mode in {'QUATERNION', 'AXIS_ANGLE'}:
+                    continue
+                bone_values = values[:, bone_index]
+                if name == "rotation_quaternion":
+                    bone_values = make_quaternions_continuous(bone_values)
+                yield int(bone_index), name, bone_values
+
+def get_action_fcurves(action, obj):
+    """Returns the F-Curve collection of an action, creating a slot and layer on Blender versions without the legacy API."""
+    if hasattr(action, "fcurves"):
+        return action.fcurves, True
+    slot = action.slots.new(id_type='OBJECT', name=obj.name)
+    strip = action.layers.new("Layer").strips.new(type='KEYFRAME')
+    obj.animation_data.action = action
+    obj.animation_data.action_slot = slot
+    return strip.channelbag(slot, ensure=True).fcurves, False
+
+def write_action(obj, action_name, recorder, interpolation='BEZIER'):
+    """Builds an action from the recorded channels. Keys are written per F-Curve in bulk instead of one keyframe_insert per key."""
+    action = bpy.data.actions.new(action_name)
+    if obj.animation_data is None:
+        obj.animation_data_create()
+    fcurves, has_groups = get_action_fcurves(action, obj)
+
+    frames = recorder.frames[:recorder.count]
+    coords = np.empty((len(frames), 2), dtype=np.float32)
+    coords[:, 0] = frames
+    interpolation_values = np.full(len(frames), INTERPOLATION_MODES[interpolation], dtype=np.int32)
+
+    for bone_index, channel, values in recorder.get_keyed_channels():
+        bone_name = recorder.bone_names[bone_index]
+        data_path = f'pose.bones["{bpy.utils.escape_identifier(bone_name)}"].{channel}'
+        for axis in range(values.shape[1]):
+            if has_groups:
+                fcurve = fcurves.new(data_path, index=axis, action_group=bone_name)
+            else:
+                fcurve = fcurves.new(data_path, index=axis)
+            coords[:, 1] = values[:, axis]
+            fcurve.keyframe_points.add(len(frames))
+            fcurve.keyframe_points.foreach_set("co", coords.ravel())
+            fcurve.keyframe_points.foreach_set("interpolation", interpolation_values)
+            fcurve.update()
+
+    obj.animation_data.action = action
+    return action
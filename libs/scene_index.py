@@ -0,0 +1,94 @@
+import bpy
+from bpy.app.handlers import persistent
+from collections import defaultdict
+
+_index = None
+# Object, collection and view layer object counts the index was built with
+_counts = None
+
+class SceneIndex:
+    """Lookup tables for object -> collections and armature -> deformed meshes. Built lazily and dropped when objects or collections are added, removed or relinked."""
+
+    def __init__(self, scene, view_layer):
+        self.scene = scene
+        self.view_layer = view_layer
+        self.object_collections = defaultdict(list)
+        self.armature_users = defaultdict(list)
+
+        for collection in bpy.data.collections:
+            for obj in collection.objects:
+                self.object_collections[obj].append(collection)
+
+        for obj in scene.objects:
+            if obj.type == "MESH":
+                for mod in obj.modifiers:
+                    if mod.type == "ARMATURE" and mod.object:
+                        self.armature_users[mod.object].append((obj, mod))
+
+def get_counts():
+    view_layer = bpy.context.view_layer
+    return len(bpy.data.objects), len(bpy.data.collections), len(view_layer.objects) if view_layer else 0
+
+def get_index(context=None):
+    """Returns the current index, rebuilding it if it was invalidated or the scene changed."""
+    global _index, _counts
+    context = context or bpy.context
+    scene = context.scene
+    view_layer = context.view_layer
+    if _index is not None:
+        try:
+            if _index.scene == scene and _index.view_layer == view_layer:
+                return _index
+        except ReferenceError:
+            pass
+    _index = SceneIndex(scene, view_layer)
+    _counts = get_counts()
+    return _index
+
+def invalidate():
+    global _index, _counts
+    _index = None
+    _counts = None
+
+def get_collections(obj):
+    """Returns all collections (excluding the scene collection) that contain this object."""
+    return get_index().object_collections.get(obj, [])
+
+def get_collection(obj):
+    """Returns the first collection that contains this object."""
+    collections = get_collections(obj)
+    return collections[0] if collections else None
+
+def get_armature_users(armature):
+    """Returns (object, modifier) pairs of all meshes in the scene deformed by the armature."""
+    return get_index().armature_users.get(armature, [])
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    """Drops the index when objects or collections were added or removed, or a collection changed its objects, not on every transform. Operators that retarget armature modifiers invalidate explicitly."""
+    if _index is None:
+        return
+    # Linking or unlinking objects updates the collection, transform-only updates never include one
+    if get_counts() != _counts or any(isinstance(update.id, bpy.types.Collection) for update in depsgraph.updates):
+        invalidate()
+
+@persistent
+def on_reset(*args):
+    invalidate()
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    bpy.app.handlers.load_post.append(on_reset)
+    bpy.app.handlers.undo_post.append(on_reset)
+    bpy.app.handlers.redo_post.append(on_reset)
+
+def unregister():
+    for handlers, handler in (
+        (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+        (bpy.app.handlers.load_post, on_reset),
+        (bpy.app.handlers.undo_post, on_reset),
+        (bpy.app.handlers.redo_post, on_reset),
+    ):
+        if handler in handlers:
+            handlers.remove(handler)
+    invalidate()
@@ -1,196 +1,165 @@
 import bpy
 import mathutils
 import math
-
-def generatr_tail_spline_ik(armature, reference_bone_names, curve_name):
-    bpy.context.view_layer.objects.active = armature
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-    # Create the standard IK bone chain with slight hyperbolic offset
-    bpy.ops.object.mode_set(mode='EDIT')
-    ik_bones_names = []
-    pole_target_offset = mathutils.Vector((0, -0.005, 0))
-    for index, bone_name in enumerate(reference_bone_names[:-1]):  # Exclude last reference from IK chain creation
-        ik_bone = armature.data.edit_bones.new(f"IK_bone_{bone_name}")
-        ik_bone.head = armature.data.edit_bones[bone_name].head
-        if index < len(reference_bone_names) - 2:  # Prevent out of range index for the last bone
-            next_bone_name = reference_bone_names[index + 1]
-            ik_bone.tail = armature.data.edit_bones[next_bone_name].head
-        else:
-            # Set the tail of the last bone using the last reference bone's head
-            ik_bone.tail = armature.data.edit_bones[reference_bone_names[-1]].head
-
-        ik_bone.tail += pole_target_offset * (1 - ((len(reference_bone_names) - 1 - index) / (len(reference_bone_names) - 1)) ** 2)
-        if index > 0:
-            ik_bone.parent = armature.data.edit_bones[ik_bones_names[-1]]
+from collections import namedtuple
+
+# A spline IK chain along existing reference bones. name is used for the IK and pole target bones
+SplineChain = namedtuple("SplineChain", ["name", "reference_bone_names", "curve_name"])
+
+TAIL_CHAIN = SplineChain("Tail", ["n_sippo_a", "n_sippo_b", "n_sippo_c", "n_sippo_d", "n_sippo_e"], "TailCurve")
+
+POLE_TARGET_OFFSET = mathutils.Vector((0, -0.005, 0))
+TARGET_LENGTH = mathutils.Vector((0, 0.1, 0))
+POLE_DISTANCE = mathutils.Vector((0, 0.3, 0))
+
+def get_ik_target_name(chain):
+    return f"IK_Target_{chain.name}"
+
+def get_pole_target_name(chain):
+    return f"Pole_Target_{chain.name}"
+
+def create_chain_edit_bones(edit_bones, chain):
+    """Creates the IK, target, control and spline IK bones of one chain. Must run in armature edit mode."""
+    refs = chain.reference_bone_names
+    heads = [edit_bones[name].head.copy() for name in refs]
+    tails = [edit_bones[name].tail.copy() for name in refs]
+    count = len(refs)
+
+    # Standard IK chain with slight hyperbolic offset, the last reference only marks the end
+    ik_bones = []
+    for index, bone_name in enumerate(refs[:-1]):
+        ik_bone = edit_bones.new(f"IK_bone_{bone_name}")
+        ik_bone.head = heads[index]
+        ik_bone.tail = heads[index + 1] + POLE_TARGET_OFFSET * (1 - ((count - 1 - index) / (count - 1)) ** 2)
+        if ik_bones:
+            ik_bone.parent = ik_bones[-1]
             ik_bone.use_connect = True
-        ik_bones_names.append(ik_bone.name)
-
-    # Create IK target and pole target
-    ik_target_bone = armature.data.edit_bones.new("IK_Target_Tail")
-    ik_target_bone.head = armature.data.edit_bones[reference_bone_names[-1]].head
-    ik_target_bone.tail = ik_target_bone.head + mathutils.Vector((0, 0.1, 0))
-
-    pole_target_bone = armature.data.edit_bones.new("Pole_Target_Tail")
-    pole_target_bone.head = armature.data.edit_bones[reference_bone_names[2]].head + mathutils.Vector((0, 0.3, 0))
-    pole_target_bone.tail = pole_target_bone.head + mathutils.Vector((0, 0.1, 0))
-
-    bpy.ops.object.mode_set(mode='POSE')
-
-    # Apply IK constraints
-    # Apply IK constraint to the second-to-last IK bone
-    if len(ik_bones_names) > 1:
-        second_last_ik_bone_name = ik_bones_names[-1]
-        second_last_ik_bone = armature.pose.bones[second_last_ik_bone_name]
-        ik_constraint = second_last_ik_bone.constraints.new('IK')
-        ik_constraint.target = armature
-        ik_constraint.subtarget = "IK_Target_Tail"
-        ik_constraint.pole_target = armature
-        ik_constraint.pole_subtarget = "Pole_Target_Tail"
-        ik_constraint.chain_count = len(ik_bones_names)
-        ik_constraint.pole_angle = math.radians(90)
-
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-    # Create control bones and ensure the last one parents to the IK target
-    bpy.ops.object.mode_set(mode='EDIT')
-    for index, bone_name in enumerate(reference_bone_names):
-        ctrl_bone_name = f"SplineCtrl_bone_{bone_name}"
-        ctrl_bone = armature.data.edit_bones.new(ctrl_bone_name)
-        ref_bone = armature.data.edit_bones[bone_name]
-        ctrl_bone.head = ref_bone.head
-        ctrl_bone.tail = ref_bone.tail
-        if index == len(reference_bone_names) - 1:
-            # Last control bone parents to IK target
-            ctrl_bone.parent = armature.data.edit_bones["IK_Target_Tail"]
-        else:
-            # Other control bones parent to their corresponding IK bones
-            ctrl_bone.parent = armature.data.edit_bones[ik_bones_names[index]]
-
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-    curve_data = bpy.data.curves.new(name=curve_name, type='CURVE')
+        ik_bones.append(ik_bone)
+
+    ik_target = edit_bones.new(get_ik_target_name(chain))
+    ik_target.head = heads[-1]
+    ik_target.tail = heads[-1] + TARGET_LENGTH
+
+    pole_target = edit_bones.new(get_pole_target_name(chain))
+    pole_target.head = heads[min(2, count - 1)] + POLE_DISTANCE
+    pole_target.tail = pole_target.head + TARGET_LENGTH
+
+    # Control bones drive the curve hooks, the last one follows the IK target
+    for index, bone_name in enumerate(refs):
+        ctrl_bone = edit_bones.new(f"SplineCtrl_bone_{bone_name}")
+        ctrl_bone.head = heads[index]
+        ctrl_bone.tail = tails[index]
+        ctrl_bone.parent = ik_target if index == count - 1 else ik_bones[index]
+
+    # Spline IK chain from head to head. A bone for the last reference would have zero length
+    previous = None
+    for index, bone_name in enumerate(refs[:-1]):
+        spl_ik_bone = edit_bones.new(f"SplineIK_bone_{bone_name}")
+        spl_ik_bone.head = heads[index]
+        spl_ik_bone.tail = heads[index + 1]
+        if previous:
+            spl_ik_bone.parent = previous
+            spl_ik_bone.use_connect = True
+        previous = spl_ik_bone
+
+def create_chain_curve(armature, chain, collection):
+    """Creates the Bezier curve of a chain with one hook per control point. Hooks are bound to the rest pose directly instead of through hook_assign."""
+    refs = chain.reference_bone_names
+    curve_data = bpy.data.curves.new(name=chain.curve_name, type='CURVE')
     curve_data.dimensions = '3D'
-    curve_object = bpy.data.objects.new(curve_name, curve_data)
-    bpy.context.collection.objects.link(curve_object)
+    curve_object = bpy.data.objects.new(chain.curve_name, curve_data)
+    collection.objects.link(curve_object)
 
     spline = curve_data.splines.new('BEZIER')
-    spline.bezier_points.add(len(reference_bone_names) - 1)
-
-    for i, bone_name in enumerate(reference_bone_names):
-        bone = armature.data.bones[bone_name]
+    spline.bezier_points.add(len(refs) - 1)
+    bones = armature.data.bones
+    for i, bone_name in enumerate(refs):
         bp = spline.bezier_points[i]
-        bp.co = armature.matrix_world @ bone.head_local
+        bp.co = armature.matrix_world @ bones[bone_name].head_local
         bp.handle_left_type = bp.handle_right_type = 'AUTO'
 
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-    # Setup hooks and ensure they are assigned
-    bpy.context.view_layer.objects.active = curve_object
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-    for i, bone_name in enumerate(reference_bone_names):
+    for i, bone_name in enumerate(refs):
         control_bone_name = f"SplineCtrl_bone_{bone_name}"
         hook_modifier = curve_object.modifiers.new(name=f"Hook_{control_bone_name}", type='HOOK')
         hook_modifier.object = armature
         hook_modifier.subtarget = control_bone_name
+        # Bezier points count as three vertices: left handle, control point, right handle
+        hook_modifier.vertex_indices_set([i * 3, i * 3 + 1, i * 3 + 2])
+        hook_modifier.center = spline.bezier_points[i].co
+        # Same binding as Hook to Selected Bone: the bone's rest matrix is cancelled out
+        bone_matrix = armature.matrix_world @ bones[control_bone_name].matrix_local
+        hook_modifier.matrix_inverse = bone_matrix.inverted_safe() @ curve_object.matrix_world
+
+    return curve_object
+
+def set_copy_rotation(constraint, armature, subtarget):
+    constraint.target = armature
+    constraint.subtarget = subtarget
+    constraint.target_space = 'LOCAL_OWNER_ORIENT'
+    constraint.owner_space = 'LOCAL'
+    constraint.mix_mode = 'AFTER'
+    constraint.use_x = True
+    constraint.use_y = True
+    constraint.use_z = True
+    constraint.use_offset = False
+    constraint.euler_order = 'ZXY'
+
+def add_chain_constraints(armature, chain, curve_object):
+    refs = chain.reference_bone_names
+    pose_bones = armature.pose.bones
+    ik_bone_names = [f"IK_bone_{name}" for name in refs[:-1]]
+    spl_ik_bone_names = [f"SplineIK_bone_{name}" for name in refs[:-1]]
+
+    if len(ik_bone_names) > 1:
+        ik_constraint = pose_bones[ik_bone_names[-1]].constraints.new('IK')
+        ik_constraint.target = armature
+        ik_constraint.subtarget = get_ik_target_name(chain)
+        ik_constraint.pole_target = armature
+        ik_constraint.pole_subtarget = get_pole_target_name(chain)
+        ik_constraint.chain_count = len(ik_bone_names)
+        ik_constraint.pole_angle = math.radians(90)
 
-         # Assign each vertex to the hook
-        bpy.ops.object.mode_set(mode='EDIT')
-        if i < len(curve_object.data.splines[0].bezier_points):  # Check to ensure index is within range
-            curve_object.data.splines[0].bezier_points[i].select_control_point = True
-            bpy.ops.object.hook_assign(modifier=hook_modifier.name)
-            bpy.ops.curve.select_all(action='DESELECT')
-        bpy.ops.object.mode_set(mode='OBJECT')
+    spline_ik = pose_bones[spl_ik_bone_names[-1]].constraints.new('SPLINE_IK')
+    spline_ik.target = curve_object
+    spline_ik.chain_count = len(spl_ik_bone_names)
+    spline_ik.use_even_divisions = True
+    spline_ik.y_scale_mode = 'BONE_ORIGINAL'
+    spline_ik.xz_scale_mode = 'BONE_ORIGINAL'
+
+    # Reference bones follow the spline IK chain, the last one follows the IK target
+    for bone_name, subtarget in zip(refs, spl_ik_bone_names + [get_ik_target_name(chain)]):
+        set_copy_rotation(pose_bones[bone_name].constraints.new('COPY_ROTATION'), armature, subtarget)
+
+def build_spline_ik_chains(armature, chains, collection=None):
+    """Builds IK and spline IK rigs along any number of bone chains. All bones are created in a single edit mode session, everything else is set on the data directly. Returns the curve objects."""
+    chains = [chain for chain in chains if len(chain.reference_bone_names) >= 2]
+    bones = armature.data.bones
+    for chain in chains:
+        missing = [name for name in chain.reference_bone_names if name not in bones]
+        if missing:
+            raise KeyError(f"Spline chain '{chain.name}' references missing bones: {', '.join(missing)}")
+    if not chains:
+        return []
+    collection = collection or bpy.context.collection
 
-    print("Hooks assigned successfully.")
-    
-    
-    
-        # Create the IK bone chain with correct tail direction
     bpy.context.view_layer.objects.active = armature
     bpy.ops.object.mode_set(mode='EDIT')
-    spl_ik_bones_names = []
-    prev_spl_ik_bone = None  # Initialize variable for previous IK bone
-    for index, spl_bone_name in enumerate(reference_bone_names):
-        spl_ik_bone = armature.data.edit_bones.new(f"SplineIK_bone_{spl_bone_name}")
-        spl_ik_bone.head = armature.data.edit_bones[spl_bone_name].head
-        if index < len(reference_bone_names) - 1:
-            next_spl_bone_name = reference_bone_names[index + 1]
-            spl_ik_bone.tail = armature.data.edit_bones[next_spl_bone_name].head
-        else:
-            spl_ik_bone.tail = spl_ik_bone.head
-        if prev_spl_ik_bone:
-            spl_ik_bone.parent = prev_spl_ik_bone  # Set the parent to the previous IK bone
-            spl_ik_bone.use_connect = True     # Ensure the bones are connected
-        else:
-            spl_ik_bone.parent = None  # First bone does not have a parent
-
-        prev_spl_ik_bone = spl_ik_bone  # Update the previous IK bone
-        spl_ik_bones_names.append(spl_ik_bone.name)  # Store the names for later reference
-
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-    # Apply Spline IK constraint to the last IK bone created
-    bpy.ops.object.mode_set(mode='POSE')
-    if spl_ik_bones_names:  # Check if list is not empty
-        last_spl_ik_bone_name = spl_ik_bones_names[-2]  # Safely access the last bone name
-        last_spl_ik_bone = armature.pose.bones[last_spl_ik_bone_name]  # Access PoseBone for constraints
-        spline_ik = last_spl_ik_bone.constraints.new('SPLINE_IK')
-        spline_ik.target = curve_object
-        spline_ik.chain_count = len(spl_ik_bones_names)  # Use the number of IK bones
-         # Set the Spline IK specific settings
-        spline_ik.use_even_divisions = True  # Fitting: Even Division
-        spline_ik.y_scale_mode = 'BONE_ORIGINAL'  # Y Scale Mode: Bone Original
-        spline_ik.xz_scale_mode = 'BONE_ORIGINAL'  # XZ Scale Mode: Bone Original
-
-    bpy.ops.object.mode_set(mode='OBJECT')
-    print("IK chain and Spline IK setup completed.")
-    
-    
-    
-    
-    
-    bpy.ops.object.mode_set(mode='POSE')
-
-    # Apply Copy Rotation constraints to each reference bone except the last
-    for i in range(len(reference_bone_names) - 1):  # Exclude the last reference bone
-        ref_bone = armature.pose.bones[reference_bone_names[i]]
-        spl_ik_bone_name = f"SplineIK_bone_{reference_bone_names[i]}"
-        
-        copy_rot = ref_bone.constraints.new('COPY_ROTATION')
-        copy_rot.target = armature
-        copy_rot.subtarget = spl_ik_bone_name
-        copy_rot.target_space = 'LOCAL_OWNER_ORIENT'
-        copy_rot.owner_space = 'LOCAL'
-        copy_rot.mix_mode = 'AFTER'
-        copy_rot.use_x = True
-        copy_rot.use_y = True
-        copy_rot.use_z = True
-        copy_rot.use_offset = False
-        copy_rot.euler_order = 'ZXY'
-        
-        
-        # Special case: last reference bone's Copy Rotation constraint targets the IK Target
-    last_ref_bone = armature.pose.bones[reference_bone_names[-1]]
-    last_copy_rot = last_ref_bone.constraints.new('COPY_ROTATION')
-    last_copy_rot.target = armature
-    last_copy_rot.subtarget = "IK_Target_Tail"  # Assuming the IK target bone's name is set
-    last_copy_rot.target_space = 'LOCAL_OWNER_ORIENT'
-    last_copy_rot.owner_space = 'LOCAL'
-    last_copy_rot.mix_mode = 'AFTER'
-    last_copy_rot.use_x = True
-    last_copy_rot.use_y = True
-    last_copy_rot.use_z = True
-    last_copy_rot.use_offset = False
-    last_copy_rot.euler_order = 'ZXY'
-
-    bpy.ops.object.mode_set(mode='OBJECT')
-    print("Copy Rotation constraints applied successfully.")
-    
-    
-    
-    
-    
-
-    print("Standard IK chain and Spline IK setup completed.")
\ No newline at end of file
+    try:
+        for chain in chains:
+            create_chain_edit_bones(armature.data.edit_bones, chain)
+    finally:
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    curves = []
+    for chain in chains:
+        curve_object = create_chain_curve(armature, chain, collection)
+        add_chain_constraints(armature, chain, curve_object)
+        curves.append(curve_object)
+
+    print(f"[Mektools] Built {len(curves)} spline IK chains.")
+    return curves
+
+def generatr_tail_spline_ik(armature, reference_bone_names, curve_name):
+    """Builds the tail spline IK rig."""
+    chain = SplineChain(TAIL_CHAIN.name, reference_bone_names, curve_name)
+    return build_spline_ik_chains(armature, [chain])[0]
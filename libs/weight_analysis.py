@@ -0,0 +1,49 @@
+import numpy as np
+from collections import namedtuple
+
+# Per vertex group statistics, indexed by vertex group index
+WeightStats = namedtuple("WeightStats", ["names", "max_weights", "vertex_counts"])
+
+def read_vertex_weights(mesh):
+    """Reads every vertex weight of a mesh once. Returns (vertex indices, group indices, weights) arrays."""
+    # Vertex weights have no foreach_get, so they are collected in a single walk over the vertices
+    elements = [(i, element.group, element.weight) for i, vertex in enumerate(mesh.vertices) for element in vertex.groups]
+    if not elements:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    elements = np.array(elements, dtype=np.float64)
+    return (
+        elements[:, 0].astype(np.int32),
+        elements[:, 1].astype(np.int32),
+        elements[:, 2].astype(np.float32),
+    )
+
+def analyze(obj, threshold=0.0):
+    """Returns the WeightStats of a mesh object. Only weights above threshold count towards vertex_counts."""
+    names = [vgroup.name for vgroup in obj.vertex_groups]
+    max_weights = np.zeros(len(names), dtype=np.float32)
+    vertex_counts = np.zeros(len(names), dtype=np.int32)
+    if obj.type != 'MESH' or not names:
+        return WeightStats(names, max_weights, vertex_counts)
+
+    vertex_indices, group_indices, weights = read_vertex_weights(obj.data)
+    # Weights can point at groups that were removed after painting
+    valid = group_indices < len(names)
+    group_indices = group_indices[valid]
+    weights = weights[valid]
+
+    np.maximum.at(max_weights, group_indices, weights)
+    vertex_counts += np.bincount(group_indices[weights > threshold], minlength=len(names)).astype(np.int32)
+    return WeightStats(names, max_weights, vertex_counts)
+
+def get_influential_groups(objects, threshold=0.0):
+    """Returns the names of all vertex groups with at least one weight above threshold on any of the objects."""
+    influential = set()
+    for obj in objects:
+        stats = analyze(obj, threshold)
+        influential.update(name for name, max_weight in zip(stats.names, stats.max_weights) if max_weight > threshold)
+    return influential
+
+def get_zero_influence_groups(obj, threshold=0.0):
+    """Returns the names of the vertex groups of an object that do not influence a single vertex."""
+    stats = analyze(obj, threshold)
+    return [name for name, max_weight in zip(stats.names, stats.max_weights) if max_weight <= threshold]
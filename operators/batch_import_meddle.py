@@ -0,0 +1,207 @@
+import bpy
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from bpy.props import BoolProperty, IntProperty, StringProperty, EnumProperty
+from ..addon_preferences import get_addon_preferences
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "libs", "batch_worker.py")
+ADDON_MODULE = __package__.rpartition(".")[0]
+REPORT_FILE = "mektools_batch_report.json"
+# Characters of a worker's log kept in the report of a failed job
+LOG_TAIL = 2000
+
+class MEKTOOLS_OT_BatchImportMeddle(bpy.types.Operator):
+    """Import a folder of Meddle exports in parallel background Blender instances, saving one .blend per character"""
+    bl_idname = "mektools.batch_import_meddle"
+    bl_label = "Batch Meddle Import"
+    bl_options = {'REGISTER'}
+
+    directory: StringProperty(subtype="DIR_PATH")  # type: ignore
+    filter_glob: StringProperty(default='*.gltf;*.glb', options={'HIDDEN'})  # type: ignore
+
+    output_directory: StringProperty(name="Output", subtype="DIR_PATH", description="Directory for the .blend files and the report. Uses a 'blend' folder inside the import folder if empty")  # type: ignore
+    workers: IntProperty(name="Workers", description="Number of Blender instances running at the same time", default=max(1, (os.cpu_count() or 2) // 2), min=1, max=64)  # type: ignore
+
+    s_merge_skin: BoolProperty(name="Merge Skin", description="Merges all skin objects", default=True)  # type: ignore
+    s_merge_by_material: BoolProperty(name="Merge by Material", description="Merges all objects with the same material", default=True)  # type: ignore
+    s_import_with_shaders_setting: BoolProperty(name="Import with Meddle Shaders", description="Tries to also import all shaders from meddle shader cache", default=True)  # type: ignore
+    s_armature_type: EnumProperty(
+        name="Armature Type",
+        description="Choose the armature type",
+        items=[
+            ("Vanilla", "Vanilla", "Use the default armature setup"),
+            ("Mekrig", "Mekrig", "Use the Mekrig armature setup"),
+        ],
+        default="Mekrig"
+    )# type: ignore
+
+    def invoke(self, context, event):
+        prefs = get_addon_preferences()
+        if prefs.default_meddle_import_path:
+            self.directory = prefs.default_meddle_import_path
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "output_directory")
+        layout.prop(self, "workers")
+        layout.separator()
+        layout.prop(self, "s_merge_skin")
+        layout.prop(self, "s_merge_by_material")
+        layout.prop(self, "s_import_with_shaders_setting")
+        layout.prop(self, "s_armature_type", expand=True)
+
+    def get_options(self):
+        return {
+            "s_merge_skin": self.s_merge_skin,
+            "s_merge_by_material": self.s_merge_by_material,
+            "s_import_with_shaders_setting": self.s_import_with_shaders_setting,
+            "s_armature_type": self.s_armature_type,
+        }
+
+    def create_jobs(self):
+        """Writes one job file per glTF in the directory. Returns the list of jobs."""
+        files = sorted(
+            entry.path for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.lower().endswith((".gltf", ".glb"))
+        )
+        self.job_dir = tempfile.mkdtemp(prefix="mektools_batch_")
+        options = self.get_options()
+        stems = [os.path.splitext(os.path.basename(filepath))[0] for filepath in files]
+        jobs = []
+        for i, filepath in enumerate(files):
+            name = stems[i]
+            # a.gltf and a.glb would both write a.blend
+            if stems.count(name) > 1:
+                name = f"{name}_{os.path.splitext(filepath)[1][1:].lower()}"
+            job = {
+                "addon": ADDON_MODULE,
+                "filepath": filepath,
+                "output": os.path.join(self.output_path, f"{name}.blend"),
+                "options": options,
+                "result": os.path.join(self.job_dir, f"{i}_result.json"),
+                "log": os.path.join(self.job_dir, f"{i}.log"),
+            }
+            job_path = os.path.join(self.job_dir, f"{i}_job.json")
+            with open(job_path, 'w') as f:
+                json.dump(job, f, indent=4)
+            job["job_path"] = job_path
+            jobs.append(job)
+        return jobs
+
+    def start_job(self, job):
+        """Starts a worker. Its output goes to a log file, a pipe nobody reads until exit would block a chatty worker."""
+        command = [bpy.app.binary_path, "--background", "--python", WORKER_SCRIPT, "--", job["job_path"]]
+        with open(job["log"], 'wb') as log:
+            job["process"] = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        job["started"] = time.perf_counter()
+        self.running.append(job)
+
+    def read_log_tail(self, job):
+        try:
+            with open(job["log"], 'rb') as f:
+                f.seek(max(0, os.path.getsize(job["log"]) - LOG_TAIL))
+                return f.read().decode('utf-8', errors='replace')
+        except OSError:
+            return ""
+
+    def finish_job(self, job):
+        result = {"file": job["filepath"], "output": job["output"], "seconds": time.perf_counter() - job["started"], "error": None}
+        if os.path.exists(job["result"]):
+            with open(job["result"], 'r') as f:
+                result.update(json.load(f))
+        else:
+            result["error"] = f"Worker exited with code {job['process'].returncode} without a result.\n{self.read_log_tail(job)}"
+        result["wall_seconds"] = time.perf_counter() - job["started"]
+        self.results.append(result)
+
+    def execute(self, context):
+        if not self.directory or not os.path.isdir(self.directory):
+            self.report({'ERROR'}, "Please select a folder")
+            return {'CANCELLED'}
+
+        self.output_path = bpy.path.abspath(self.output_directory) if self.output_directory else os.path.join(self.directory, "blend")
+        os.makedirs(self.output_path, exist_ok=True)
+
+        self.pending = self.create_jobs()
+        if not self.pending:
+            shutil.rmtree(self.job_dir, ignore_errors=True)
+            self.report({'WARNING'}, "No .gltf or .glb files found.")
+            return {'CANCELLED'}
+
+        self.total = len(self.pending)
+        self.running = []
+        self.results = []
+        self.batch_start = time.perf_counter()
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.5, window=context.window)
+        wm.progress_begin(0, self.total)
+        wm.modal_handler_add(self)
+        self.report({'INFO'}, f"Batch importing {self.total} files with {self.workers} workers...")
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            for job in self.running:
+                job["process"].kill()
+                job["process"].wait()
+                self.finish_job(job)
+            self.running = []
+            self.pending = []
+            return self.finish(context, cancelled=True)
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        for job in [job for job in self.running if job["process"].poll() is not None]:
+            self.running.remove(job)
+            self.finish_job(job)
+
+        while self.pending and len(self.running) < self.workers:
+            self.start_job(self.pending.pop(0))
+
+        context.window_manager.progress_update(len(self.results))
+        if not self.pending and not self.running:
+            return self.finish(context)
+        return {'RUNNING_MODAL'}
+
+    def finish(self, context, cancelled=False):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        shutil.rmtree(self.job_dir, ignore_errors=True)
+
+        failed = [result for result in self.results if result["error"]]
+        report = {
+            "directory": self.directory,
+            "output_directory": self.output_path,
+            "workers": self.workers,
+            "options": self.get_options(),
+            "cancelled": cancelled,
+            "total_seconds": time.perf_counter() - self.batch_start,
+            "succeeded": len(self.results) - len(failed),
+            "failed": len(failed),
+            "files": self.results,
+        }
+        report_path = os.path.join(self.output_path, REPORT_FILE)
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=4)
+
+        if failed:
+            self.report({'WARNING'}, f"Batch import finished with {len(failed)} failures, see {report_path}")
+        else:
+            self.report({'INFO'}, f"Batch imported {len(self.results)} files, report written to {report_path}")
+        return {'CANCELLED'} if cancelled else {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(MEKTOOLS_OT_BatchImportMeddle)
+
+def unregister():
+    bpy.utils.unregister_class(MEKTOOLS_OT_BatchImportMeddle)
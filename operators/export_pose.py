@@ -1,11 +1,12 @@
 import bpy
 import json
+import numpy as np
 import os
-import re
 from bpy.types import Operator
-from bpy.props import BoolProperty
+from bpy.props import BoolProperty, EnumProperty, IntProperty
 from bpy_extras.io_utils import ExportHelper  
 from ..addon_preferences import get_addon_preferences 
+from ..libs import pose_engine, pose_container, pose_io
 
 BONE_GROUPS = ["Hair", "Face", "HandL", "HandR", "Tail", "Gear", "Body"]
 
@@ -27,6 +28,39 @@ class EXPORT_POSE_OT(Operator, ExportHelper):
     save_position: BoolProperty(name="Pos", default=True)
     save_rotation: BoolProperty(name="Rot", default=True)
     save_scale: BoolProperty(name="Scale", default=True)
+
+    export_mode: EnumProperty(
+        name="Mode",
+        description="Export the current frame or every frame of a range",
+        items=[
+            ("FRAME", "Current Frame", "Export the current frame into a single .pose file"),
+            ("NUMBERED", "Numbered Set", "Export every frame into its own numbered .pose file"),
+            ("CONTAINER", "Sequence", "Export every frame into a single multi-pose .pose file"),
+        ],
+        default="FRAME"
+    )# type: ignore
+    frame_range: EnumProperty(
+        name="Range",
+        description="Frames to export in sequence modes",
+        items=[
+            ("ACTION", "Action", "Use the frame range of the active action"),
+            ("SCENE", "Scene", "Use the frame range of the scene"),
+            ("CUSTOM", "Custom", "Use a custom frame range"),
+        ],
+        default="ACTION"
+    )# type: ignore
+    file_format: EnumProperty(
+        name="Format",
+        description="File format of the exported poses",
+        items=[
+            ("JSON", "JSON", "Readable .pose file, compatible with other tools"),
+            ("BINARY", "Binary", "Compact binary container with float32 channels, loads without parsing"),
+        ],
+        default="JSON"
+    )# type: ignore
+    frame_start: IntProperty(name="Start", default=1)  # type: ignore
+    frame_end: IntProperty(name="End", default=250)  # type: ignore
+    frame_step: IntProperty(name="Step", default=1, min=1)  # type: ignore
     
     
     def invoke(self, context, event):
@@ -71,23 +105,95 @@ class EXPORT_POSE_OT(Operator, ExportHelper):
         col.prop(self, "Tail", toggle=True)
         col.prop(self, "Gear", toggle=True)
         col.prop(self, "Body", toggle=True)
-        
-        
 
-    
+        layout.separator()
+
+        layout.label(text="Frames:")
+        layout.prop(self, "file_format", expand=True)
+        layout.prop(self, "export_mode", text="")
+        if self.export_mode != 'FRAME':
+            layout.prop(self, "frame_range", expand=True)
+            col = layout.column(align=True)
+            if self.frame_range == 'CUSTOM':
+                col.prop(self, "frame_start")
+                col.prop(self, "frame_end")
+            col.prop(self, "frame_step")
+
+    def get_frames(self, context, armature):
+        """Returns the frames to export in sequence modes."""
+        if self.frame_range == 'ACTION' and armature.animation_data and armature.animation_data.action:
+            start, end = armature.animation_data.action.frame_range
+            start, end = int(start), int(end)
+        elif self.frame_range == 'CUSTOM':
+            start, end = self.frame_start, self.frame_end
+        else:
+            start, end = context.scene.frame_start, context.scene.frame_end
+        return range(start, end + 1, self.frame_step)
+
+    def build_bones(self, armature, bone_names):
+        """Computes the 'Bones' dict of the current frame for all exported bones in one pass."""
+        transforms = pose_engine.get_relative_transforms(armature, bone_names)
+        return pose_engine.format_pose_bones(bone_names, transforms, self.save_position, self.save_rotation, self.save_scale)
+
+    def build_channels(self, armature, bone_names):
+        """Computes the binary container channels of the current frame for all exported bones in one pass."""
+        transforms = pose_engine.get_relative_transforms(armature, bone_names)
+        return pose_engine.get_container_channels(bone_names, transforms, self.save_position, self.save_rotation, self.save_scale)
+
+    def get_header(self, type_name, frames=None):
+        header = {
+            "FileExtension": ".pose",
+            "TypeName": type_name,
+            "FileVersion": 2,
+        }
+        if frames is not None:
+            header["FrameStart"] = frames.start
+            header["FrameStep"] = frames.step
+        return header
+
+    def write_frame(self, filepath, armature, bone_names):
+        # Cached memory maps of the old file have to be released before it is overwritten
+        pose_engine.forget_pose_file(filepath)
+        if self.file_format == 'BINARY':
+            names, positions, rotations, scales = self.build_channels(armature, bone_names)
+            with pose_container.ContainerWriter(filepath, names, 1, header=self.get_header("Mektools Pose")) as writer:
+                writer.write_pose(0, positions, rotations, scales)
+            return
+
+        skeleton_data = self.get_header("Mektools Pose")
+        skeleton_data["Bones"] = self.build_bones(armature, bone_names)
+        with open(filepath, 'w') as f:
+            json.dump(skeleton_data, f, indent=4)
+
+    def write_numbered(self, context, armature, bone_names, frames):
+        base_path = os.path.splitext(self.filepath)[0]
+        for frame in frames:
+            context.scene.frame_set(frame)
+            self.write_frame(f"{base_path}_{frame:04d}.pose", armature, bone_names)
+
+    def write_container(self, context, armature, bone_names, frames):
+        """Streams every frame into a single file instead of collecting them in memory."""
+        pose_engine.forget_pose_file(self.filepath)
+        header = self.get_header("Mektools Pose Sequence", frames)
+
+        if self.file_format == 'BINARY':
+            names = list(pose_engine.get_container_bone_order(bone_names))
+            with pose_container.ContainerWriter(self.filepath, names, len(frames), [str(frame) for frame in frames], header) as writer:
+                for i, frame in enumerate(frames):
+                    context.scene.frame_set(frame)
+                    writer.write_pose(i, *self.build_channels(armature, bone_names)[1:])
+            return
+
+        with open(self.filepath, 'w') as f:
+            f.write(json.dumps(header)[:-1] + ', "Frames": [\n')
+            for i, frame in enumerate(frames):
+                context.scene.frame_set(frame)
+                if i:
+                    f.write(",\n")
+                f.write(json.dumps({"Frame": frame, "Bones": self.build_bones(armature, bone_names)}))
+            f.write("\n]}\n")
+
     def execute(self, context):
-        # Load bone groups from the JSON file
-        json_path = os.path.join(os.path.dirname(__file__), "..", "data", "bone_groups.json")
-        with open(json_path) as f:
-            bone_groups = json.load(f)
-        
-        # Get selected bone groups from the export dialog
-        selected_groups = {group for group in BONE_GROUPS if getattr(self, group)}
-        selected_bones = [bone for group in selected_groups for bone in bone_groups.get(group, [])]
-        
-        if "Hair" in selected_groups:
-            selected_bones.extend([bone.name for bone in context.object.pose.bones if bone.name.startswith("j_ex")])
-        
         # Prepare data for export
         armature = context.object
         if not armature or armature.type != 'ARMATURE':
@@ -99,35 +205,27 @@ class EXPORT_POSE_OT(Operator, ExportHelper):
             self.report({'ERROR'}, "Origin bone 'n_throw' not found")
             return {'CANCELLED'}
         
-        root_matrix_world = armature.matrix_world @ root_bone.matrix
-        skeleton_data = {
-            "FileExtension": ".pose",
-            "TypeName": "Mektools Pose",
-            "FileVersion": 2,
-            "Bones": {}
-        }
-        
-        # Collect data for selected bones
-        for bone_name in selected_bones:
-            clean_bone_name = re.sub(r"\.\d+$", "", bone_name)  # Remove .xxx suffix
-            bone = armature.pose.bones.get(bone_name)
-            if bone:
-                bone_matrix_world = armature.matrix_world @ bone.matrix
-                relative_matrix = root_matrix_world.inverted() @ bone_matrix_world
-                
-                bone_data = {}
-                if self.save_position:
-                    bone_data["Position"] = f"{relative_matrix.translation.x:.6f}, {relative_matrix.translation.y:.6f}, {relative_matrix.translation.z:.6f}"
-                if self.save_rotation:
-                    bone_data["Rotation"] = f"{relative_matrix.to_quaternion().x:.6f}, {relative_matrix.to_quaternion().y:.6f}, {relative_matrix.to_quaternion().z:.6f}, {relative_matrix.to_quaternion().w:.6f}"
-                if self.save_scale:
-                    bone_data["Scale"] = f"{relative_matrix.to_scale().x:.8f}, {relative_matrix.to_scale().y:.8f}, {relative_matrix.to_scale().z:.8f}"
-                
-                skeleton_data["Bones"][clean_bone_name] = bone_data
-        
-        # Write to the file
-        with open(self.filepath, 'w') as f:
-            json.dump(skeleton_data, f, indent=4)
+        # Get selected bone groups from the export dialog, the group masks already include every j_ex bone for hair
+        selected_groups = [group for group in BONE_GROUPS if getattr(self, group)]
+        mask = pose_io.get_groups_mask(armature, selected_groups)
+        all_bone_names = pose_io.get_bone_names(armature)
+        bone_names = [all_bone_names[i] for i in np.flatnonzero(mask)]
+
+        if self.export_mode == 'FRAME':
+            self.write_frame(self.filepath, armature, bone_names)
+        else:
+            frames = self.get_frames(context, armature)
+            if not frames:
+                self.report({'ERROR'}, "Frame range is empty")
+                return {'CANCELLED'}
+            current_frame = context.scene.frame_current
+            try:
+                if self.export_mode == 'NUMBERED':
+                    self.write_numbered(context, armature, bone_names, frames)
+                else:
+                    self.write_container(context, armature, bone_names, frames)
+            finally:
+                context.scene.frame_set(current_frame)
         
         self.report({'INFO'}, "Pose exported successfully!")
         return {'FINISHED'}
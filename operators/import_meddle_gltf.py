@@ -1,46 +1,20 @@
 import bpy
 import os
-import importlib.util
 from bpy.props import BoolProperty, StringProperty
 from collections import defaultdict, namedtuple
 import re
-from ..addon_preferences import get_addon_preferences 
-from ..libs import spline_gen, helper
-
-# Load the bone names from bone_names.py in the data folder
-DATA_PATH = os.path.join(os.path.dirname(__file__), "../data")
-BONE_NAMES_FILE = os.path.join(DATA_PATH, "bone_names.py")
+from ..addon_preferences import get_addon_preferences, get_import_cache_path
+from ..libs import spline_gen, helper, mesh_merge, bone_classifier, scene_index, gltf_scan, gltf_prune, import_cache, data_registry, dependencies
+from ..libs.import_session import ImportSession
+from ..libs.armature_state import ArmatureState
+from . import mekrig_operators
 
 Stripped_Armature_Data = namedtuple("Stripped_Armature_Data", ["armature", "original_parents"])
 
-racial_code_to_operator = {
-    'c0101': 'mektools.import_mekrig_midlander_male',
-    'c0201': 'mektools.import_mekrig_midlander_female',
-    'c0301': 'mektools.import_mekrig_highlander_male',
-    'c0401': 'mektools.import_mekrig_highlander_female',
-    'c0501': 'mektools.import_mekrig_elezen_male',
-    'c0601': 'mektools.import_mekrig_elezen_female',
-    'c0701': 'mektools.import_mekrig_miqote_male',
-    'c0801': 'mektools.import_mekrig_miqote_female',
-    'c0901': 'mektools.import_mekrig_roegadyn_male',
-    'c1001': 'mektools.import_mekrig_roegadyn_female',
-    'c1101': 'mektools.import_mekrig_lalafell_both',
-    'c1201': 'mektools.import_mekrig_lalafell_both',
-    'c1301': 'mektools.import_mekrig_aura_male',
-    'c1401': 'mektools.import_mekrig_aura_female',
-    'c1501': 'mektools.import_mekrig_hrothgar_male',
-    'c1601': 'mektools.import_mekrig_hrothgar_female',
-    'c1701': 'mektools.import_mekrig_viera_male',
-    'c1801': 'mektools.import_mekrig_viera_female',
-}
-
-def load_bone_names():
-    spec = importlib.util.spec_from_file_location("bone_names", BONE_NAMES_FILE)
-    bone_names = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(bone_names)
-    return bone_names.bone_names  # This assumes bone_names.py defines a list named `bone_names`
-
 def import_meddle_shader(self, imported_objects):
+    if not dependencies.is_meddle_available():
+        raise RuntimeError("MeddleTools operators are not available")
+
     for obj in imported_objects:
         try:
             if obj and obj.type == "MESH": 
@@ -75,55 +49,43 @@ def parent_poles_to_root(armature):
 def append_mekrig(racial_code):
     """Appends the correct Mekrig depending on Racial Code and returns the armature and its collection."""
 
-    scene_collections_before = set(bpy.data.collections)
+    operator_id = data_registry.get_race_operators()[racial_code]
+    collection = mekrig_operators.append_mekrig_collection(operator_id)
+    scene_index.invalidate()
+    if not collection:
+        return None
 
-    operator_id = racial_code_to_operator[racial_code]
-    eval(f"bpy.ops.{operator_id}()")
-
-    scene_collections_after = set(bpy.data.collections)
-
-    new_collections = scene_collections_after - scene_collections_before
-    
-    imported_armature = None
-
-    for collection in new_collections:
-        for obj in collection.objects:
-            if obj.type == "ARMATURE":  
-                imported_armature = obj
-                break     
-        if imported_armature:
-            break
+    for obj in collection.all_objects:
+        if obj.type == "ARMATURE":  
+            return obj
 
-    return imported_armature
+    return None
 
 def merge_armatures(armature_a, armature_b):
     """Merges armature B into armature A and updates only relevant objects that were using armature B.Returns the final merged armature (A)."""
     bpy.ops.object.mode_set(mode="OBJECT")
     bpy.ops.object.select_all(action='DESELECT')
 
-    collection_a = next((col for col in bpy.data.collections if armature_a.name in col.objects), None)
-    collection_b = next((col for col in bpy.data.collections if armature_b.name in col.objects), None)
+    collection_a = scene_index.get_collection(armature_a)
+    collection_b = scene_index.get_collection(armature_b)
 
     stripped_armature_data = remove_duplicate_bones(armature_a, armature_b)
     armature_b = stripped_armature_data.armature  
     
     assign_bones_to_collection(armature_b, armature_b.pose.bones, 'Not Mekrig Bones', False)
 
-    objects_with_b = []
-    for obj in bpy.context.scene.objects: 
-        if obj.type == "MESH": 
-            for mod in obj.modifiers:
-                if mod.type == "ARMATURE" and mod.object == armature_b:
-                    objects_with_b.append((obj, mod))
+    objects_with_b = list(scene_index.get_armature_users(armature_b))
 
     bpy.ops.object.select_all(action='DESELECT')
     bpy.context.view_layer.objects.active = armature_a
     armature_a.select_set(True)
     armature_b.select_set(True)
     bpy.ops.object.join() 
+    scene_index.invalidate()
 
     for obj, mod in objects_with_b:
         mod.object = armature_a  
+    scene_index.invalidate()
 
     bpy.ops.object.mode_set(mode="OBJECT")
 
@@ -132,6 +94,7 @@ def merge_armatures(armature_a, armature_b):
     if collection_a and collection_b and collection_a != collection_b:
         bpy.context.scene.collection.children.unlink(collection_a)
         collection_b.children.link(collection_a)
+        scene_index.invalidate()
 
     return armature_a    
 
@@ -164,14 +127,8 @@ def merge_by_material(objects):
         if len(meshes) < 2:
             new_objects.update(meshes)  # Keep unmerged meshes
             continue
-        bpy.ops.object.select_all(action='DESELECT')
-        for mesh in meshes:
-            mesh.select_set(True)
-        bpy.context.view_layer.objects.active = meshes[0]
-        bpy.ops.object.join()
-        merged_object = bpy.context.view_layer.objects.active
+        merged_object = mesh_merge.merge_objects(meshes)
         new_objects.add(merged_object)
-        bpy.ops.object.select_all(action='DESELECT')
 
     non_mesh_objects = set()
     for obj in all_objects:
@@ -243,36 +200,52 @@ def link_objects_to_collection(objects, collection):
             collection.objects.link(obj)
         except ReferenceError:
             print(f"[Mektools] Skipping deleted object: {obj}")
+    scene_index.invalidate()
            
-def import_model(filepath: str, collection=None, pack_images=True, disable_bone_shape=False, merge_vertices=False, bone_heuristic='TEMPERANCE'):
+def import_model(filepath: str, collection=None, pack_images=True, disable_bone_shape=False, merge_vertices=False, bone_heuristic='TEMPERANCE', prune=False):
     """Imports GLTF or FBX. Returns list of imported objects."""
-    scene_objects = set(bpy.context.scene.objects)
     ext = os.path.splitext(filepath)[1].lower()
-
-    if ext in [".gltf", ".glb"]:
-        bpy.ops.import_scene.gltf(
-            filepath=filepath,
-            import_pack_images=pack_images,
-            disable_bone_shape=disable_bone_shape,
-            merge_vertices=merge_vertices,
-            bone_heuristic=bone_heuristic
-        )
-        # Remove glTF garbage collection if present
-        garbage_collection = bpy.data.collections.get("glTF_not_exported")
-        if garbage_collection:
-            bpy.data.collections.remove(garbage_collection)
-    elif ext == ".fbx":
-        bpy.ops.import_scene.fbx(filepath=filepath)
-    else:
+    if ext not in [".gltf", ".glb", ".fbx"]:
         raise ValueError(f"Unsupported file extension: {ext}")
 
-    imported_objs = [obj for obj in bpy.context.scene.objects if obj not in scene_objects]
+    with ImportSession() as session:
+        import_file(filepath, ext, pack_images, disable_bone_shape, merge_vertices, bone_heuristic, prune)
+
+    # Remove glTF garbage collection if present, its objects are left without any collection
+    for garbage_collection in session.collections:
+        if garbage_collection.name.startswith("glTF_not_exported"):
+            bpy.data.collections.remove(garbage_collection)
+    imported_objs = [obj for obj in session.objects if obj.users_collection]
+    scene_index.invalidate()
 
     if collection:
         link_objects_to_collection(imported_objs, collection)
 
     return imported_objs
 
+def import_file(filepath, ext, pack_images, disable_bone_shape, merge_vertices, bone_heuristic, prune):
+    """Runs the Blender importer for the file extension."""
+    if ext in [".gltf", ".glb"]:
+        import_path = filepath
+        if prune:
+            try:
+                import_path = gltf_prune.write_pruned(filepath)
+            except (OSError, ValueError, KeyError, IndexError) as e:
+                print(f"[Mektools] Failed to prune glTF, importing the original file: {e}")
+        try:
+            bpy.ops.import_scene.gltf(
+                filepath=import_path,
+                import_pack_images=pack_images,
+                disable_bone_shape=disable_bone_shape,
+                merge_vertices=merge_vertices,
+                bone_heuristic=bone_heuristic
+            )
+        finally:
+            if import_path != filepath:
+                os.remove(import_path)
+    elif ext == ".fbx":
+        bpy.ops.import_scene.fbx(filepath=filepath)
+
 def remove_custom_shapes(armature):
     """Removes custom shapes from all bones in the given armature."""
     bpy.context.view_layer.objects.active = armature
@@ -330,22 +303,19 @@ def attache_mekrig(armature, racial_code):
         bpy.ops.pose.reset()
         
         merged_armature = merge_armatures(mekrig, armature)
-        hair_bones = assign_bones_to_collection(merged_armature, merged_armature.pose.bones, 'Hair', True, ['j_ex', 'j_kami'])
-        assign_bones_to_collection(merged_armature, merged_armature.pose.bones, 'Physic',False, ['phys'])
-        assign_bones_to_collection(merged_armature, merged_armature.pose.bones, 'IVCS', False, ['iv_'])
-        
-        set_bone_display(merged_armature, hair_bones, 'cs.hair', 'THEME01')
+        bone_classifier.classify_bones(merged_armature)
         
         return merged_armature
     return None
     
 def get_racial_code(objects):
     """Searches for an object containing specified ID in its name and extracts the racial code."""
+    race_operators = data_registry.get_race_operators()
     # Primary check for meddle should be based on the object['raceCode']
     for obj in objects:
         if 'raceCode' in obj.keys():
             racial_code = f'c{obj["raceCode"]}'
-            if racial_code in racial_code_to_operator:
+            if racial_code in race_operators:
                 return racial_code
             
     # check for iris.shpk material on any object
@@ -357,7 +327,7 @@ def get_racial_code(objects):
                     match = re.search(r'c(\d{4})', mat.name.lower())
                     if match:
                         racial_code = f'c{match.group(1)}'
-                        if racial_code in racial_code_to_operator:
+                        if racial_code in race_operators:
                             return racial_code
                         
     return 'c0101'  # default to midlander male if not found
@@ -383,28 +353,16 @@ def merge_by_name(objects, name_filter):
     if len(filtered_objects) < 2:
         return list(updated_objects)  
 
-    bpy.ops.object.select_all(action='DESELECT')  
-    for obj in filtered_objects:
-        obj.select_set(True)
-
-    bpy.context.view_layer.objects.active = filtered_objects[0]  
-    bpy.ops.object.join() 
-
-    merged_object = bpy.context.view_layer.objects.active
-
     updated_objects.difference_update(filtered_objects)  
-    updated_objects.add(merged_object) 
 
-    bpy.ops.object.select_all(action='DESELECT') 
+    merged_object = mesh_merge.merge_objects(filtered_objects)
+    updated_objects.add(merged_object) 
 
     return list(updated_objects)  
 
 def get_collection(object):
     """Returns the collection that contains this object."""
-    for collection in bpy.data.collections:
-        if any(object is coll_obj for coll_obj in collection.objects): 
-            return collection  
-    return None  
+    return scene_index.get_collection(object)
 
 def link_to_collection(objects, collection):
     for obj in objects:
@@ -414,6 +372,7 @@ def link_to_collection(objects, collection):
                 collection.objects.link(obj)  
         except ReferenceError:
             print(f"[Mektools] Skipping deleted object: {obj}")
+    scene_index.invalidate()
                     
 def unlink_from_collection(collection):
     """Unlinks all objects and sub-collections from the given collection while keeping the objects in the scene."""
@@ -437,21 +396,6 @@ def delete_rna_from_objects(objects):
             pass    
     return new_objects
 
-def set_bone_display(armature, bones, cs_bone_name = None, theme = None):
-    bpy.ops.object.mode_set(mode='POSE')
-    cs_obj = None
-    if cs_bone_name:
-        cs_obj = bpy.data.objects.get(cs_bone_name)
-    for bone_name in bones:
-        pose_bone = armature.pose.bones.get(bone_name)
-        if pose_bone:
-            if cs_obj:
-                pose_bone.custom_shape = cs_obj
-            if theme:
-                pose_bone.color.palette = theme 
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-
 class MEKTOOLS_OT_ImportGLTFFromMeddle(bpy.types.Operator):
     """Import GLTF from Meddle and perform cleanup tasks"""
     bl_idname = "mektools.import_meddle_gltf"
@@ -464,6 +408,7 @@ class MEKTOOLS_OT_ImportGLTFFromMeddle(bpy.types.Operator):
     s_pack_images: BoolProperty(name="Pack-Images", description="Pack all Images into .blend file", default=True)  # type: ignore
     s_merge_vertices: BoolProperty(name="Merge Vertices", description="The glTF format requires discontinuous normals, UVs, and other vertex attributes to be stored as separate vertices, as required for rendering on typical graphics hardware. This option attempts to combine co -located vertices where possible. Currently cannot combine verts with different normals.", default=False)  # type: ignore
     s_import_collection: BoolProperty(name="Import-Collection", description="Stores all import in a seperatre Collection", default=False)  # type: ignore
+    s_prune_gltf: BoolProperty(name="Prune glTF", description="Strips animations, unused nodes, accessors and images from the glTF before importing it. Bone scales are kept", default=False)  # type: ignore
     
     s_merge_skin: BoolProperty(name="Merge Skin", description="Merges all skin objects", default=True)  # type: ignore
     s_merge_by_material: BoolProperty(name="Merge by Material", description="Merges all objects with the same material", default=True)  # type: ignore
@@ -533,6 +478,10 @@ class MEKTOOLS_OT_ImportGLTFFromMeddle(bpy.types.Operator):
         split.label(text=" ")
         split.prop(self, "s_import_collection")
         
+        split = col.split(factor=indent)  
+        split.label(text=" ")
+        split.prop(self, "s_prune_gltf")
+        
         # 🔹 Mesh Options Section
         box = layout.box()
         row = box.row()
@@ -599,22 +548,52 @@ class MEKTOOLS_OT_ImportGLTFFromMeddle(bpy.types.Operator):
             split = col.split(factor=indent_nested)  
             split.label(text=" ")
             split.prop(self, "s_spline_gear")
+    
+    def get_cache_options(self):
+        """Returns all import settings that influence the result, used as part of the import cache key."""
+        prefs = get_addon_preferences()
+        options = {name: getattr(self, name) for name in type(self).__annotations__ if name.startswith("s_")}
+        options["ex_button_spline_tail"] = prefs.ex_button_spline_tail
+        if self.s_armature_type == 'Mekrig':
+            options["mekrig_assets"] = mekrig_operators.get_mekrig_asset_mtimes()
+        return options
            
     def execute(self, context):  
-        bpy.context.window.cursor_set('WAIT')   
+        helper.set_cursor('WAIT')   
         
         if not self.filepath or not (self.filepath.lower().endswith(".gltf") or self.filepath.lower().endswith(".glb") or self.filepath.lower().endswith(".fbx")): 
             self.report({'ERROR'}, "Please select a File")
             return {'CANCELLED'}   
 
+        # re-imports of the same export with the same settings append the cached result
+        prefs = get_addon_preferences()
+        cache_key = None
+        if prefs.general_import_cache == 'ON':
+            cache_dir = get_import_cache_path()
+            cache_key = import_cache.compute_key(self.filepath, self.get_cache_options())
+            if import_cache.load(cache_dir, cache_key):
+                bpy.ops.object.select_all(action='DESELECT')
+                self.report({'INFO'}, "Model appended from the import cache.")
+                helper.set_cursor('DEFAULT')
+                return {'FINISHED'}
+
+        # pre-scan the glTF header so the race is known before the heavy import
+        racial_code = None
+        if not self.filepath.lower().endswith(".fbx"):
+            race_operators = data_registry.get_race_operators()
+            racial_code = gltf_scan.get_racial_code(gltf_scan.scan(self.filepath), race_operators)
+            if racial_code and self.s_armature_type == 'Mekrig':
+                mekrig_operators.prepare_mekrig_template(race_operators[racial_code])
+
         #base import function
         import_collection = helper.create_collection("Model_Import")
         import_collection.color_tag = "COLOR_05"
         heuristic = self.s_armature_heuristic if self.s_armature_type == 'Vanilla' else 'BLENDER'
 
-        object_set = import_model(self.filepath, import_collection, self.s_pack_images, self.s_disable_bone_shape, self.s_merge_vertices, heuristic)
+        object_set = import_model(self.filepath, import_collection, self.s_pack_images, self.s_disable_bone_shape, self.s_merge_vertices, heuristic, self.s_prune_gltf)
         
-        racial_code = get_racial_code(object_set)
+        if not racial_code:
+            racial_code = get_racial_code(object_set)
         
         armature = find_armature_in_objects(object_set)  
         
@@ -627,13 +606,10 @@ class MEKTOOLS_OT_ImportGLTFFromMeddle(bpy.types.Operator):
         
         # remove animation track from the imported objects
         # if animation data exists, apply the scaling directly to the bones and remove the pose afterwards
-        bone_scales = {}
+        bone_state = None
         if armature.pose and armature.pose.bones:
-            for bone in armature.pose.bones:
-                try:
-                    bone_scales[bone.name] = bone.scale.copy()  # Store the original scale of the bone
-                except ReferenceError:
-                    print(f"[Mektools] Skipping deleted bone: {bone}")
+            # Store the original bone scales, read in bulk
+            bone_state = ArmatureState(armature, collections=False, constraints=False, channels=True).capture()
         
             for obj in object_set:
                 try:
@@ -674,26 +650,28 @@ class MEKTOOLS_OT_ImportGLTFFromMeddle(bpy.types.Operator):
                 parent_poles_to_root(armature)  
                 
             if self.s_spline_tail:
-                reference_bones = ["n_sippo_a", "n_sippo_b", "n_sippo_c", "n_sippo_d", "n_sippo_e"]
-                spline_gen.generatr_tail_spline_ik(
-                    armature=armature,
-                    reference_bone_names=reference_bones,
-                    curve_name="TailCurve"
-                )
+                spline_gen.build_spline_ik_chains(armature, [spline_gen.TAIL_CHAIN])
             armature.data["mektools_armature_type"] = "mekrig"
             
         armature.name = armature.name 
 
-        if armature.pose and armature.pose.bones:
-            # apply bone scales to the armature
-            for bone in armature.pose.bones:
-                try:
-                    if bone.name in bone_scales:
-                        bone.scale = bone_scales[bone.name]  # Apply the stored scale to the bone
-                except ReferenceError:
-                    print(f"[Mektools] Skipping deleted bone: {bone}")
+        if bone_state and armature.pose and armature.pose.bones:
+            # apply bone scales to the armature, matched by name since Mekrig replaces the armature
+            bone_state.restore(armature, channels={"scale"})
         
              
+        if cache_key:
+            try:
+                if self.s_import_collection:
+                    import_cache.store(cache_dir, cache_key, prefs.import_cache_size * 1024 * 1024, collection=import_collection)
+                elif self.s_armature_type == 'Mekrig':
+                    import_cache.store(cache_dir, cache_key, prefs.import_cache_size * 1024 * 1024, collection=mekrig_collection)
+                else:
+                    cached_objects = delete_rna_from_objects(object_set) | {armature}
+                    import_cache.store(cache_dir, cache_key, prefs.import_cache_size * 1024 * 1024, objects=list(cached_objects))
+            except (OSError, RuntimeError) as e:
+                print(f"[Mektools] Failed to write import cache: {e}")
+             
         if not self.s_import_collection:
             unlink_from_collection(import_collection)
             bpy.data.collections.remove(import_collection) 
@@ -701,7 +679,7 @@ class MEKTOOLS_OT_ImportGLTFFromMeddle(bpy.types.Operator):
         bpy.ops.object.select_all(action='DESELECT')
         
         self.report({'INFO'}, "Model imported and processed successfully.")
-        bpy.context.window.cursor_set('DEFAULT')
+        helper.set_cursor('DEFAULT')
         return {'FINISHED'}
 
 def register():
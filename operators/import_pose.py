@@ -1,22 +1,20 @@
 import bpy
-import json
-import mathutils
-import re
+import numpy as np
 from bpy.types import Operator
-from mathutils import Matrix, Quaternion
-from mathutils import Vector
+from mathutils import Quaternion
 from ..addon_preferences import get_addon_preferences 
+from ..libs import pose_engine, constraint_solver, pose_io
+from ..libs.armature_state import ArmatureState
 
-collection_visibility = {}
-
-def set_pole_targets(armature):
+def set_pole_targets(armature, solver=None):
     print("Moving pole targets to their respective IK bones...")
+    if solver is None:
+        solver = constraint_solver.PoseSolver(armature)
+    depsgraph_updated = False
 
     for bone in armature.pose.bones:
         for constraint in bone.constraints:
             if constraint.type == 'IK':
-                print(f"Processing IK constraint on bone '{bone.name}'...")
-
                 if not constraint.pole_target or not constraint.pole_subtarget:
                     print(f"No valid pole target or subtarget for IK constraint on bone '{bone.name}'. Skipping.")
                     continue
@@ -26,32 +24,73 @@ def set_pole_targets(armature):
                     print(f"Pole target bone '{constraint.pole_subtarget}' not found. Skipping.")
                     continue
 
-                pole_target.matrix.translation = bone.matrix.translation
-                print(f"Moved pole target '{pole_target.name}' to position of IK bone '{bone.name}'.")
+                if solver.exact[bone.name] and solver.exact[pole_target.name]:
+                    matrix = solver.get_pose_matrix(pole_target).copy()
+                    matrix.translation = solver.get_pose_matrix(bone).translation
+                    solver.set_pose_matrix(pole_target, matrix)
+                else:
+                    # Bones with custom inheritance need Blender's evaluated matrices
+                    if not depsgraph_updated:
+                        bpy.context.view_layer.update()
+                        depsgraph_updated = True
+                    pole_target.matrix.translation = bone.matrix.translation
+                    solver.invalidate(pole_target)
 
     print("Pole targets moved successfully.")    
 
+def apply_reversed_constraint(armature, constraint, bone, target_bone):
+    """Reverses a constraint through a temporary constraint and visual_transform_apply, for setups the solver does not cover."""
+    new_constraint = target_bone.constraints.new(type=constraint.type)
+    new_constraint.target = armature
+    new_constraint.subtarget = bone.name 
+    
+    
+    new_constraint.target_space = constraint.target_space
+    new_constraint.owner_space = constraint.owner_space
+    new_constraint.influence = constraint.influence
+    
+    if constraint.type == "COPY_TRANSFORMS":
+        new_constraint.mix_mode = constraint.mix_mode
+        new_constraint.remove_target_shear = constraint.remove_target_shear
+    
+    if constraint.type == "COPY_ROTATION":
+        new_constraint.mix_mode = constraint.mix_mode
+        new_constraint.euler_order = constraint.euler_order  
+        new_constraint.use_x = constraint.use_x
+        new_constraint.use_y = constraint.use_y
+        new_constraint.use_z = constraint.use_z    
+        new_constraint.invert_x = constraint.invert_x
+        new_constraint.invert_y = constraint.invert_y
+        new_constraint.invert_z = constraint.invert_z
+        
+    if constraint.type == "COPY_LOCATION":
+        new_constraint.use_offset = constraint.use_offset
+        new_constraint.use_x = constraint.use_x
+        new_constraint.use_y = constraint.use_y
+        new_constraint.use_z = constraint.use_z    
+        new_constraint.invert_x = constraint.invert_x
+        new_constraint.invert_y = constraint.invert_y
+        new_constraint.invert_z = constraint.invert_z
+
+    # Apply the constraint on the target bone
+    bpy.ops.object.mode_set(mode='POSE')
+    bpy.ops.pose.select_all(action='DESELECT')
+    target_bone.bone.select = True
+    bpy.ops.pose.visual_transform_apply()
+    target_bone.constraints.remove(new_constraint)
+
 def reverse_constraints(armature):
+    """Moves the targets of all copy constraints onto their owners. Returns the solver holding the resulting pose matrices."""
     print("Reversing constraints...")
 
-    arm = armature.pose
-    
-    sorted_bones = []
-
-    def collect_bones_recursive(bone):
-        sorted_bones.append(bone)
-        for child in bone.children:
-            collect_bones_recursive(child)
-            
-    for bone in arm.bones:
-        if bone.parent is None:
-            collect_bones_recursive(bone)
+    solver = constraint_solver.PoseSolver(armature)
+    sorted_bones = pose_engine.get_bones_parent_first(armature)
+    solved = 0
+    applied = 0
 
     for bone in sorted_bones:
         for constraint in bone.constraints:
             if constraint.type in {'COPY_LOCATION', 'COPY_ROTATION', "COPY_TRANSFORMS"}:
-                print(f"Reversing constraint '{constraint.name}' on bone '{bone.name}'")
-
                 original_target = constraint.target
                 target_bone_name = constraint.subtarget
 
@@ -64,48 +103,17 @@ def reverse_constraints(armature):
                     print(f"Target bone '{target_bone_name}' not found. Skipping constraint '{constraint.name}'.")
                     continue
 
-                new_constraint = target_bone.constraints.new(type=constraint.type)
-                new_constraint.target = armature
-                new_constraint.subtarget = bone.name 
-                
-                
-                new_constraint.target_space = constraint.target_space
-                new_constraint.owner_space = constraint.owner_space
-                new_constraint.influence = constraint.influence
-                
-                if constraint.type == "COPY_TRANSFORMS":
-                    new_constraint.mix_mode = constraint.mix_mode
-                    new_constraint.remove_target_shear = constraint.remove_target_shear
-                
-                if constraint.type == "COPY_ROTATION":
-                    new_constraint.mix_mode = constraint.mix_mode
-                    new_constraint.euler_order = constraint.euler_order  
-                    new_constraint.use_x = constraint.use_x
-                    new_constraint.use_y = constraint.use_y
-                    new_constraint.use_z = constraint.use_z    
-                    new_constraint.invert_x = constraint.invert_x
-                    new_constraint.invert_y = constraint.invert_y
-                    new_constraint.invert_z = constraint.invert_z
-                    
-                if constraint.type == "COPY_LOCATION":
-                    new_constraint.use_offset = constraint.use_offset
-                    new_constraint.use_x = constraint.use_x
-                    new_constraint.use_y = constraint.use_y
-                    new_constraint.use_z = constraint.use_z    
-                    new_constraint.invert_x = constraint.invert_x
-                    new_constraint.invert_y = constraint.invert_y
-                    new_constraint.invert_z = constraint.invert_z
-
-                # Apply the constraint on the target bone
-                bpy.ops.object.mode_set(mode='POSE')
-                bpy.ops.pose.select_all(action='DESELECT')
-                target_bone.bone.select = True
-                bpy.ops.pose.visual_transform_apply()
-                target_bone.constraints.remove(new_constraint)
-
-                print(f"Constraint reversed and applied on '{target_bone_name}'.")
-
-    print("Constraints reversed successfully.")
+                # The reversed constraint lives on the target bone and targets this bone
+                if solver.can_solve(constraint, target_bone, bone):
+                    solver.set_pose_matrix(target_bone, solver.solve_copy_constraint(constraint, target_bone, bone))
+                    solved += 1
+                else:
+                    apply_reversed_constraint(armature, constraint, bone, target_bone)
+                    solver.invalidate(target_bone)
+                    applied += 1
+
+    print(f"Constraints reversed successfully. {solved} solved directly, {applied} applied through Blender.")
+    return solver
     
 def reset_bones_in_collections(armature, collection_names, force_reset):
     if isinstance(collection_names, str):
@@ -113,6 +121,7 @@ def reset_bones_in_collections(armature, collection_names, force_reset):
 
     print(f"Resetting rotations for bones in collections: {collection_names}...")
 
+    mask = np.zeros(len(armature.pose.bones), dtype=bool)
     for collection_name in collection_names:
         bone_collection = armature.data.collections_all.get(collection_name)
         if not bone_collection:
@@ -123,18 +132,17 @@ def reset_bones_in_collections(armature, collection_names, force_reset):
             print(f"Bone collection '{collection_name}' is hidden. Unhiding for processing.")
             bone_collection.is_visible = True
 
-        for bone in bone_collection.bones:
-            pose_bone = armature.pose.bones.get(bone.name)
-            if pose_bone:
-                has_valid_constraint = any(
-                    constraint.type in {'COPY_ROTATION', 'COPY_LOCATION', 'COPY_TRANSFORMS'}
-                    for constraint in pose_bone.constraints
-                )
-                
-                if has_valid_constraint or force_reset:
-                    print(f"Resetting rotation for bone '{pose_bone.name}' in collection '{collection_name}'...")
-                    pose_bone.rotation_quaternion = Quaternion((1, 0, 0, 0))
-    
+        mask |= pose_io.get_mask(armature, (bone.name for bone in bone_collection.bones))
+
+    if not force_reset:
+        pose_bones = armature.pose.bones
+        for i in np.flatnonzero(mask):
+            mask[i] = any(
+                constraint.type in {'COPY_ROTATION', 'COPY_LOCATION', 'COPY_TRANSFORMS'}
+                for constraint in pose_bones[int(i)].constraints
+            )
+
+    pose_io.reset_channels(armature, mask, ("rotation_quaternion",))
     print("Rotation reset completed.")
 
 class POSE_OT_LoadBone(bpy.types.Operator):
@@ -147,60 +155,32 @@ class POSE_OT_LoadBone(bpy.types.Operator):
     path: bpy.props.StringProperty()
     diff: bpy.props.FloatVectorProperty(size=4)
 
-    def strip_suffix(self, name):
-        """Remove any .xxx suffix from the bone name."""
-        return re.sub(r'\.\d+$', '', name)
-
     def execute(self, context):
-        arm = context.object.pose
-
-        print("Bone:", self.bone)
-        print("Path:", self.path)
-        print("Diff:", self.diff)
+        armature = context.object
 
         # Strip suffix from the provided bone name
-        stripped_bone_name = self.strip_suffix(self.bone)
-
-        with open(self.path, 'r') as f:
-            pose = json.load(f)['Bones']
+        stripped_bone_name = pose_engine.strip_suffix(self.bone)
 
-        # Search for the bone in the armature, matching without suffix
-        bone = next((b for b in arm.bones if self.strip_suffix(b.name) == stripped_bone_name), None)
-        if not bone:
-            print(f"Bone '{stripped_bone_name}' not found in the armature.")
-            return {'FINISHED'}
-
-        # Get the transformation data for the bone
-        trans = pose.get(stripped_bone_name)
-        if not trans:
+        pose = pose_engine.read_pose_file(self.path)
+        if stripped_bone_name not in pose:
             print(f"Bone '{stripped_bone_name}' not found in the pose file.")
             return {'FINISHED'}
 
-        # Apply rotation
         try:
-            rot = trans["Rotation"].split(", ")
-            rot = [float(x) for x in rot]
-            # Convert XYZW to WXYZ
-            rot.insert(0, rot.pop())
-            diff_quat = Quaternion(self.diff[:3], self.diff[3])
-            rot = Quaternion(rot) @ diff_quat
-            bone.rotation_quaternion = context.object.convert_space(
-                pose_bone=bone,
-                matrix=rot.to_matrix().to_4x4(),
-                from_space='POSE',
-                to_space='LOCAL'
-            ).to_quaternion()
+            pose_engine.apply_pose(armature, {stripped_bone_name: pose[stripped_bone_name]}, self.diff)
         except Exception as e:
             print(f"Failed to apply rotation: {e}")
-            return {'ERROR'}
+            return {'CANCELLED'}
 
         print(f"Successfully loaded bone: {self.bone}")
         return {'FINISHED'}
     
-def import_pose(filepath, armature):
+def import_pose(filepath, armature, pose_index=0):
     print("Starting pose import process...")
     
-    bpy.ops.pose.reset()
+    pose_io.reset_channels(armature)
+    # foreach_set does not refresh the pose matrices the root diff and rest offsets are read from
+    bpy.context.view_layer.update()
     
     arm = armature.pose
 
@@ -210,30 +190,24 @@ def import_pose(filepath, armature):
         print("Root bone 'n_throw' not found.")
         return
 
-    root_bone.matrix_basis = Matrix()
-    aa = Quaternion([1, 0, 0, 0]).rotation_difference(root_bone.matrix.to_quaternion()).to_axis_angle()
-    diff = [aa[0][0], aa[0][1], aa[0][2], aa[1]]
+    diff = pose_engine.get_root_diff(root_bone)
 
-    # Temporarily disable all constraints
-    for bone in arm.bones:
-        for constraint in bone.constraints:
-            constraint.mute = True
-            
-    # Apply pose data
-    for bone in arm.bones:
-        bpy.ops.pose.load_bone('EXEC_DEFAULT', bone=bone.name, path=filepath, diff=diff)
-        
+    # Temporarily disable all constraints, their mute states are restored afterwards
+    state = ArmatureState(armature, collections=False).capture()
+    state.mute_constraints()
+
+    # Apply pose data, the file is parsed once and every bone is set in a single parent-first pass
+    pose = pose_engine.read_pose_file(filepath, pose_index)
+    pose_engine.apply_pose(armature, pose, diff)
         
     # Reverse constraints
-    reverse_constraints(armature)
+    solver = reverse_constraints(armature)
     
     #Pole target Calculation and Adjustment
-    set_pole_targets(armature)
+    set_pole_targets(armature, solver)
 
     # Re-enable constraints
-    for bone in arm.bones:
-        for constraint in bone.constraints:
-            constraint.mute = False
+    state.restore()
                
     reset_bones_in_collections(armature, ["DEF", "MCH", "Face (Primary)", "Face", "Face (Secondary)", "IVCS", "Physic"], True)
             
@@ -243,27 +217,12 @@ def import_pose(filepath, armature):
     
     return {'FINISHED'}
 
-def store_collection_visibility(collection):
-    """Recursively stores visibility states of collections and their parents"""
-    collection_visibility[collection.name] = {
-        "visible": collection.is_visible,
-        "parent": collection.parent.name if collection.parent else None
-    }
-    for sub_collection in collection.children:
-        store_collection_visibility(sub_collection)
-        
-def restore_collection_visibility(collection, armature):
-    """Recursively restores visibility states of collections"""
-    if collection.name in collection_visibility:
-        stored_state = collection_visibility[collection.name]
-        parent_name = stored_state["parent"]
-        
-        if parent_name and parent_name in [c.name for c in armature.data.collections_all]:
-            parent_collection = next(c for c in armature.data.collections_all if c.name == parent_name)
-            restore_collection_visibility(parent_collection, armature)
+def import_pose_with_visibility(filepath, armature, pose_index=0):
+    """Imports a pose with every bone collection visible, restoring the visibility afterwards."""
+    with ArmatureState(armature, constraints=False) as state:
+        state.show_all_collections()
+        import_pose(filepath, armature, pose_index)
 
-        collection.is_visible = stored_state["visible"]   
-    
 class IMPORT_POSE_OT(Operator):
     """Import Pose File this is experimental. Face bones are not properly calculatyed rn"""
     bl_idname = "pose.import"
@@ -288,20 +247,7 @@ class IMPORT_POSE_OT(Operator):
         
         bpy.context.window.cursor_set('WAIT')
         
-        # Store visibility states of all collections
-        for collection in armature.data.collections_all:
-            store_collection_visibility(collection)
-
-        # Enable all collections
-        for collection in armature.data.collections_all:
-            collection.is_visible = True
-            
-        # Import the pose
-        import_pose(self.filepath, armature)
-        
-        # Restore all collections properly
-        for collection in armature.data.collections_all:
-            restore_collection_visibility(collection, armature)
+        import_pose_with_visibility(self.filepath, armature)
                 
         bpy.context.window.cursor_set('DEFAULT')
         
@@ -1,6 +1,7 @@
 import bpy
 from bpy.types import Operator
 import os
+from ..libs import mekrig_cache
 
 # Define the path to the assets folder relative to this file
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), "../assets")
@@ -13,28 +14,17 @@ class MEKTOOLS_OT_ImportMekrigBase(Operator):
     file_name: str
 
     def execute(self, context):
-        # Construct the file path
-        file_path = os.path.join(ASSETS_PATH, self.file_name)
-
-        # Check if the .blend file exists
-        if not os.path.exists(file_path):
-            self.report({'ERROR'}, f"File not found: {file_path}")
+        if not get_mekrig_asset(self.bl_idname):
+            self.report({'ERROR'}, f"File not found: {os.path.join(ASSETS_PATH, self.file_name)}")
             return {'CANCELLED'}
 
-        # Load and append the specified collection from the .blend file
-        with bpy.data.libraries.load(file_path, link=False) as (data_from, data_to):
-            if self.collection_name in data_from.collections:
-                data_to.collections = [self.collection_name]
-            else:
-                self.report({'WARNING'}, f"Collection '{self.collection_name}' not found in {file_path}")
-                return {'CANCELLED'}
-
-        # Link the collection to the current scene
-        for collection in data_to.collections:
-            bpy.context.scene.collection.children.link(collection)
+        # Copies the collection from the session template cache and links it to the scene
+        collection = append_mekrig_collection(self.bl_idname)
+        if not collection:
+            self.report({'WARNING'}, f"Collection '{self.collection_name}' not found in {self.file_name}")
+            return {'CANCELLED'}
 
         self.report({'INFO'}, f"Successfully imported {self.collection_name}")
-        bpy.ops.ed.undo_push()
         return {'FINISHED'}
 
 
@@ -143,6 +133,48 @@ class MEKTOOLS_OT_ImportMekrigHrothgarFemale(MEKTOOLS_OT_ImportMekrigBase):
     collection_name = "Actor ( Hrothgar Female )"
     file_name = "Hrothgar Female.blend"
 
+def get_mekrig_operator(operator_id):
+    """Returns the Mekrig import operator class for a given bl_idname."""
+    for cls in MEKTOOLS_OT_ImportMekrigBase.__subclasses__():
+        if cls.bl_idname == operator_id:
+            return cls
+    return None
+
+def get_mekrig_asset(operator_id):
+    """Returns (file_path, collection_name) of a Mekrig import operator, or None if the operator or file does not exist."""
+    cls = get_mekrig_operator(operator_id)
+    if not cls:
+        return None
+    file_path = os.path.join(ASSETS_PATH, cls.file_name)
+    if not os.path.exists(file_path):
+        print(f"[Mektools] File not found: {file_path}")
+        return None
+    return file_path, cls.collection_name
+
+def get_mekrig_asset_mtimes():
+    """Returns file name -> modification time of every Mekrig asset, part of the import cache key so updated rigs are not served from the cache."""
+    mtimes = {}
+    for cls in MEKTOOLS_OT_ImportMekrigBase.__subclasses__():
+        file_path = os.path.join(ASSETS_PATH, cls.file_name)
+        mtimes[cls.file_name] = os.path.getmtime(file_path) if os.path.exists(file_path) else None
+    return mtimes
+
+def prepare_mekrig_template(operator_id):
+    """Loads the Mekrig template into the session cache ahead of time."""
+    asset = get_mekrig_asset(operator_id)
+    if asset:
+        mekrig_cache.get_template(*asset)
+
+def append_mekrig_collection(operator_id):
+    """Appends a Mekrig collection without going through the operator. Returns the linked collection or None."""
+    asset = get_mekrig_asset(operator_id)
+    if not asset:
+        return None
+    collection = mekrig_cache.instantiate(*asset)
+    if collection:
+        bpy.context.scene.collection.children.link(collection)
+    return collection
+
 # Register and unregister functions
 def register():
     bpy.utils.register_class(MEKTOOLS_OT_ImportMekrigLalafellBoth)
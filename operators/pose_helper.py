@@ -1,5 +1,6 @@
 import bpy
 from bpy.types import Operator
+from ..libs import pose_io
 
 class POSE_RESET_OT(Operator):
     """Reset Transform of every Bone in Armature"""
@@ -13,10 +14,7 @@ class POSE_RESET_OT(Operator):
             self.report({'ERROR'}, "No armature selected.")
             return {'CANCELLED'}
         
-        for bone in armature.pose.bones:
-            bone.location = (0, 0, 0)
-            bone.rotation_quaternion = (1, 0, 0, 0)
-            bone.scale = (1, 1, 1)
+        pose_io.reset_channels(armature)
         
         self.report({'INFO'}, "Pose Reset for all bones.")
         return {'FINISHED'}
@@ -33,15 +31,12 @@ class POSE_RESET_OT_Selection(Operator):
             self.report({'ERROR'}, "No armature selected.")
             return {'CANCELLED'}
         
-        selected_bones = [bone for bone in armature.pose.bones if bone.bone.select]
-        if not selected_bones:
+        selection = pose_io.get_selection_mask(armature)
+        if not selection.any():
             self.report({'WARNING'}, "No bones selected.")
             return {'CANCELLED'}
         
-        for bone in selected_bones:
-            bone.location = (0, 0, 0)
-            bone.rotation_quaternion = (1, 0, 0, 0)
-            bone.scale = (1, 1, 1)
+        pose_io.reset_channels(armature, selection)
         
         self.report({'INFO'}, "Pose Reset for selected bones.")
         return {'FINISHED'}
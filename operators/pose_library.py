@@ -0,0 +1,117 @@
+import bpy
+import os
+from bpy.types import Operator, PropertyGroup
+from bpy.props import CollectionProperty, EnumProperty, IntProperty, StringProperty
+from ..addon_preferences import get_addon_preferences, get_user_path
+from ..libs import pose_library
+from .export_pose import BONE_GROUPS
+from .import_pose import import_pose_with_visibility
+
+class MEKTOOLS_PG_PoseLibraryItem(PropertyGroup):
+    rel_path: StringProperty()  # type: ignore
+    groups: StringProperty()  # type: ignore
+    pose_count: IntProperty()  # type: ignore
+    bone_count: IntProperty()  # type: ignore
+
+def fill_library_items(window_manager, entries):
+    items = window_manager.mektools_pose_library
+    items.clear()
+    for rel_path, entry in sorted(entries.items(), key=lambda item: item[1].name.lower()):
+        item = items.add()
+        item.name = entry.name
+        item.rel_path = rel_path
+        item.groups = ",".join(entry.groups)
+        item.pose_count = entry.pose_count
+        item.bone_count = len(entry.bones)
+    window_manager.mektools_pose_library_index = min(window_manager.mektools_pose_library_index, max(len(items) - 1, 0))
+
+class POSE_OT_LibraryRefresh(Operator):
+    """Scans the default pose import folder. Only files changed since the last scan are parsed again"""
+    bl_idname = "pose.library_refresh"
+    bl_label = "Refresh Pose Library"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        prefs = get_addon_preferences()
+        folder = bpy.path.abspath(prefs.default_pose_import_path)
+        if not prefs.default_pose_import_path or not os.path.isdir(folder):
+            self.report({'ERROR'}, "Set a valid default pose import path in the preferences first.")
+            return {'CANCELLED'}
+
+        context.window.cursor_set('WAIT')
+        try:
+            entries = pose_library.scan(folder, get_user_path("pose_library"))
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to scan pose library: {e}")
+            return {'CANCELLED'}
+        finally:
+            context.window.cursor_set('DEFAULT')
+
+        fill_library_items(context.window_manager, entries)
+        self.report({'INFO'}, f"Pose library holds {len(entries)} files.")
+        return {'FINISHED'}
+
+class POSE_OT_LibraryApply(Operator):
+    """Applies the selected library pose to the active armature"""
+    bl_idname = "pose.library_apply"
+    bl_label = "Apply Library Pose"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    rel_path: StringProperty(description="Relative path of the pose file, uses the active library item if empty")  # type: ignore
+    pose_index: IntProperty(name="Pose", description="Pose of a sequence file to apply", default=0, min=0)  # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.type == 'ARMATURE'
+
+    def execute(self, context):
+        rel_path = self.rel_path
+        if not rel_path:
+            wm = context.window_manager
+            if not 0 <= wm.mektools_pose_library_index < len(wm.mektools_pose_library):
+                self.report({'ERROR'}, "No library pose selected.")
+                return {'CANCELLED'}
+            rel_path = wm.mektools_pose_library[wm.mektools_pose_library_index].rel_path
+
+        entry = pose_library.get_entry(rel_path)
+        if not entry:
+            self.report({'ERROR'}, "Pose is not in the library anymore, refresh it.")
+            return {'CANCELLED'}
+        if self.pose_index >= entry.pose_count:
+            self.report({'ERROR'}, f"Pose file only holds {entry.pose_count} poses.")
+            return {'CANCELLED'}
+
+        try:
+            import_pose_with_visibility(entry.path, context.object, self.pose_index)
+        except (OSError, ValueError, KeyError) as e:
+            self.report({'ERROR'}, f"Failed to apply pose: {e}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Applied pose '{entry.name}'.")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(MEKTOOLS_PG_PoseLibraryItem)
+    bpy.utils.register_class(POSE_OT_LibraryRefresh)
+    bpy.utils.register_class(POSE_OT_LibraryApply)
+
+    bpy.types.WindowManager.mektools_pose_library = CollectionProperty(type=MEKTOOLS_PG_PoseLibraryItem)
+    bpy.types.WindowManager.mektools_pose_library_index = IntProperty(default=0)
+    bpy.types.WindowManager.mektools_pose_library_pose = IntProperty(name="Pose", description="Pose of a multi-pose file to apply", default=0, min=0)
+    bpy.types.WindowManager.mektools_pose_library_group = EnumProperty(
+        name="Bone Group",
+        description="Only show poses containing bones of this group",
+        items=[('ALL', "All Groups", "")] + [(group, group, "") for group in BONE_GROUPS],
+        default='ALL'
+    )
+
+def unregister():
+    del bpy.types.WindowManager.mektools_pose_library_group
+    del bpy.types.WindowManager.mektools_pose_library_pose
+    del bpy.types.WindowManager.mektools_pose_library_index
+    del bpy.types.WindowManager.mektools_pose_library
+
+    bpy.utils.unregister_class(POSE_OT_LibraryApply)
+    bpy.utils.unregister_class(POSE_OT_LibraryRefresh)
+    bpy.utils.unregister_class(MEKTOOLS_PG_PoseLibraryItem)
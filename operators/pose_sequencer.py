@@ -0,0 +1,119 @@
+import bpy
+import os
+import re
+from bpy.types import Operator, OperatorFileListElement
+from bpy.props import CollectionProperty, EnumProperty, IntProperty, StringProperty
+from ..addon_preferences import get_addon_preferences
+from ..libs import pose_engine, pose_sequencer, helper
+from ..libs.armature_state import ArmatureState
+from .import_pose import import_pose
+
+def natural_sort_key(name):
+    """Sorts pose_2 before pose_10."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+class POSE_OT_SequenceToAction(Operator):
+    """Builds an action from a folder or selection of .pose files, keying each pose at a fixed frame interval"""
+    bl_idname = "pose.sequence_to_action"
+    bl_label = "Poses to Action"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(subtype="DIR_PATH")  # type: ignore
+    files: CollectionProperty(type=OperatorFileListElement)  # type: ignore
+    filter_glob: StringProperty(default='*.pose', options={'HIDDEN'})  # type: ignore
+
+    action_name: StringProperty(name="Action", description="Name of the new action, uses the folder name if empty")  # type: ignore
+    frame_start: IntProperty(name="Start Frame", default=1)  # type: ignore
+    frame_interval: IntProperty(name="Interval", description="Frames between two poses", default=10, min=1)  # type: ignore
+    interpolation: EnumProperty(
+        name="Interpolation",
+        items=[
+            ("CONSTANT", "Constant", "Hold each pose until the next one"),
+            ("LINEAR", "Linear", "Straight blend between poses"),
+            ("BEZIER", "Bezier", "Smooth blend between poses"),
+        ],
+        default="BEZIER"
+    )# type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.type == 'ARMATURE'
+
+    def invoke(self, context, event):
+        prefs = get_addon_preferences()
+        if prefs.default_pose_import_path:
+            self.directory = prefs.default_pose_import_path
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "action_name")
+        col = layout.column(align=True)
+        col.prop(self, "frame_start")
+        col.prop(self, "frame_interval")
+        layout.prop(self, "interpolation")
+
+    def get_pose_files(self):
+        """Returns the selected .pose files, or every .pose file in the directory if none were selected, in natural order."""
+        names = [file.name for file in self.files if file.name.lower().endswith(".pose")]
+        if not names:
+            names = [name for name in os.listdir(self.directory) if name.lower().endswith(".pose")]
+        return [os.path.join(self.directory, name) for name in sorted(names, key=natural_sort_key)]
+
+    def execute(self, context):
+        armature = context.object
+        if "n_throw" not in armature.pose.bones:
+            self.report({'ERROR'}, "Origin bone 'n_throw' not found")
+            return {'CANCELLED'}
+        if not self.directory or not os.path.isdir(self.directory):
+            self.report({'ERROR'}, "Please select a folder or pose files.")
+            return {'CANCELLED'}
+
+        # Multi-pose files contribute every pose they hold
+        poses = []
+        for filepath in self.get_pose_files():
+            try:
+                pose_count = len(pose_engine.read_pose_sequence(filepath))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[Mektools] Skipping unreadable pose file '{filepath}': {e}")
+                continue
+            poses.extend((filepath, pose_index) for pose_index in range(pose_count))
+        if not poses:
+            self.report({'ERROR'}, "No readable .pose files found.")
+            return {'CANCELLED'}
+
+        helper.set_cursor('WAIT')
+        animation_data = armature.animation_data
+        previous_action = animation_data.action if animation_data else None
+        # An assigned action would override every pose that gets applied
+        if previous_action:
+            animation_data.action = None
+
+        recorder = pose_sequencer.ChannelRecorder(armature, len(poses))
+        try:
+            with ArmatureState(armature, constraints=False) as state:
+                state.show_all_collections()
+                for i, (filepath, pose_index) in enumerate(poses):
+                    import_pose(filepath, armature, pose_index)
+                    recorder.record(self.frame_start + i * self.frame_interval)
+        except Exception:
+            if previous_action:
+                animation_data.action = previous_action
+            helper.set_cursor('DEFAULT')
+            raise
+
+        action_name = self.action_name or os.path.basename(os.path.normpath(self.directory))
+        action = pose_sequencer.write_action(armature, action_name, recorder, self.interpolation)
+        context.scene.frame_set(self.frame_start)
+
+        helper.set_cursor('DEFAULT')
+        self.report({'INFO'}, f"Keyed {len(poses)} poses into action '{action.name}'.")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(POSE_OT_SequenceToAction)
+
+def unregister():
+    bpy.utils.unregister_class(POSE_OT_SequenceToAction)
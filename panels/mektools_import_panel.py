@@ -1,8 +1,8 @@
 import bpy
 from bpy.types import Panel
-import addon_utils
 import webbrowser
 from ..addon_preferences import get_addon_preferences 
+from ..libs import dependencies
 
 class VIEW3D_PT_ImportPanel(Panel):
     bl_label = "Import"
@@ -14,41 +14,18 @@ class VIEW3D_PT_ImportPanel(Panel):
     def draw(self, context):
         prefs = get_addon_preferences()
         layout = self.layout
-        #First we check if meddle is installed
-        isMeddleInstalled = False
-
-        # We go through each addon and see if we find a 'Meddle Tools' addon
-        for mod in addon_utils.modules():
-            if mod.bl_info['name'] == "Meddle Tools":  
-                isMeddleInstalled = True
-
-                break
-        has_operators = False
- 
-        # Ideally, using a try/catch block for the logic of your code is not the best practice
-        # try/catch blocks are for handling exceptions, not for controlling the flow of your code
-        # but i had no fucking clue how to do it otherwise, so it stays.
-        try:
-            # We check if the operators are available
-            # If someone just installed the addon (without restarting blender)
-            # these will error out, so we need to catch that
-            # once someone restarts blender these go through no problemo
-            bpy.ops.meddle.import_shaders.poll()
-            bpy.ops.meddle.apply_to_selected.poll()
-
-            #we set the operators as true to display all the buttons and shenanigans
-            has_operators = True
-            #print(f"Both MeddleTools operators found")
-
-        except (AttributeError, RuntimeError):
-            print(f"MeddleTools operators not found")
-            has_operators = False
+        # Meddle detection is cached, it is only resolved again when addons are enabled or disabled
+        meddle_status = dependencies.get_meddle_status()
+        isMeddleInstalled = meddle_status.installed
+        has_operators = meddle_status.has_operators
+
         # Import Buttons Section
         # We check if meddle is instaslled AND its initialized properly (after a restart)
         if isMeddleInstalled and has_operators:
 
             row = layout.row(align=True)
             row.operator("mektools.import_meddle_gltf", text="Character Import", icon = "IMPORT") #should only show if meddle is installed Subject for later refactor 
+            row.operator("mektools.batch_import_meddle", text="", icon = "FILE_FOLDER")
             
             row = layout.row(align=True) # these should only show if meddle is installed 
 
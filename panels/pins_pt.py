@@ -1,7 +1,7 @@
 import bpy
 from bpy.types import Panel
 from ..addon_preferences import get_addon_preferences 
-from ..libs import pins, helper
+from ..libs import pins, pin_focus, helper
 from ..custom_icons import preview_collections
 
 class ItemPin(bpy.types.PropertyGroup):
@@ -32,7 +32,7 @@ class UI_UL_Pins(bpy.types.UIList):
         for i, item in enumerate(items):
             flag = self.bitflag_filter_item 
 
-            if hide_ghosts and item.object not in bpy.context.view_layer.objects.values():  # Hides objects that are not in the Scene but in the blend file. This happens if the item was deleted but still has a user.
+            if hide_ghosts and pins.is_ghost(item.object):  # Hides objects that are not in the Scene but in the blend file. This happens if the item was deleted but still has a user.
                 flag &= ~self.bitflag_filter_item  
         
             filtered.append(flag)
@@ -44,7 +44,7 @@ class UI_UL_Pins(bpy.types.UIList):
         obj = item.object      
         if self.layout_type in {'DEFAULT', 'COMPACT'}:
             if obj:
-                if obj in bpy.context.view_layer.objects.values():
+                if not pins.is_ghost(obj):
                     icon_id = helper.get_object_icon(obj)
                 else: 
                     icon_id = "GHOST_DISABLED"
@@ -94,6 +94,7 @@ class MEKTOOLS_PT_Pins(Panel):
         box = layout.box()
         row = box.split(factor=0.63)
         row.label(text="Pins")
+        row.prop(scene, "pins_focus", toggle=True, icon='FREEZE')
             
         row = box.row()
         row.template_list("UI_UL_Pins", "", scene, "pins", scene, "pins_index")
@@ -123,15 +124,24 @@ def register():
     
     bpy.types.Scene.hide_ghosts = bpy.props.BoolProperty(name="Hide Ghosts", default=True)
     bpy.types.Scene.suppress_pins = bpy.props.BoolProperty(name="supressPinList", default=False)
+    bpy.types.Scene.pins_focus = bpy.props.BoolProperty(
+        name="Focus",
+        description="Disable armature modifiers, constraints and control collections of every pinned character except the active one",
+        default=False,
+        update=pin_focus.on_focus_changed
+    )
     
     bpy.utils.register_class(MEKTOOLS_PT_Pins)
+    pins.add_callback()
 
 def unregister():
+    pins.remove_callback()
     bpy.utils.unregister_class(MEKTOOLS_PT_Pins)
     del bpy.types.Scene.pins
     del bpy.types.Scene.pins_index
     del bpy.types.Scene.hide_ghosts
     del bpy.types.Scene.suppress_pins
+    del bpy.types.Scene.pins_focus
 
     bpy.utils.unregister_class(ItemPin)
     bpy.utils.unregister_class(UI_UL_Pins)
@@ -1,5 +1,5 @@
 import bpy
-from bpy.types import Panel
+from bpy.types import Panel, UIList
 from ..addon_preferences import get_addon_preferences 
       
 class VIEW3D_PT_PoseHelper(Panel):
@@ -45,6 +45,8 @@ class VIEW3D_PT_PoseHelper(Panel):
         if self.prefs.ex_button_import_pose == 'ON':
             row.operator("pose.import", text="Import", icon="IMPORT")
         row.operator("pose.export", text="Export", icon="EXPORT")
+        if self.prefs.ex_button_import_pose == 'ON':
+            col.operator("pose.sequence_to_action", text="Poses to Action", icon="ACTION")
         
         if self.prefs.general_transform_tools == 'ON':
             col = layout.column(align=False)
@@ -99,11 +101,66 @@ class VIEW3D_PT_PoseHelper(Panel):
             row.operator("pose.reset_selection", text="Selection", icon="BONE_DATA")
 
 
+class POSE_UL_PoseLibrary(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.label(text=item.name, icon="ARMATURE_DATA")
+        if item.pose_count > 1:
+            row.label(text=f"{item.pose_count} poses")
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        group = context.window_manager.mektools_pose_library_group
+        text = self.filter_name.lower()
+
+        flags = []
+        for item in items:
+            visible = text in item.name.lower() and (group == 'ALL' or group in item.groups.split(","))
+            flags.append(self.bitflag_filter_item if visible else 0)
+        if self.use_filter_invert:
+            flags = [flag ^ self.bitflag_filter_item for flag in flags]
+        # Items are already sorted by name when the library is filled
+        return flags, []
+
+class VIEW3D_PT_PoseLibrary(Panel):
+    bl_idname = "VIEW3D_PT_PoseLibrary"
+    bl_label = "Pose Library"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Mektools"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'ARMATURE'
+
+    def draw(self, context):
+        wm = context.window_manager
+        layout = self.layout
+
+        row = layout.row(align=True)
+        row.prop(wm, "mektools_pose_library_group", text="")
+        row.operator("pose.library_refresh", text="", icon="FILE_REFRESH")
+
+        layout.template_list("POSE_UL_PoseLibrary", "", wm, "mektools_pose_library", wm, "mektools_pose_library_index", rows=6)
+        row = layout.row(align=True)
+        index = wm.mektools_pose_library_index
+        pose_index = 0
+        if 0 <= index < len(wm.mektools_pose_library) and wm.mektools_pose_library[index].pose_count > 1:
+            row.prop(wm, "mektools_pose_library_pose")
+            pose_index = min(wm.mektools_pose_library_pose, wm.mektools_pose_library[index].pose_count - 1)
+        row.operator("pose.library_apply", text="Apply", icon="IMPORT").pose_index = pose_index
+
+
 def register():
     bpy.utils.register_class(VIEW3D_PT_PoseHelper)
+    bpy.utils.register_class(POSE_UL_PoseLibrary)
+    bpy.utils.register_class(VIEW3D_PT_PoseLibrary)
 
 
 def unregister():
+    bpy.utils.unregister_class(VIEW3D_PT_PoseLibrary)
+    bpy.utils.unregister_class(POSE_UL_PoseLibrary)
     bpy.utils.unregister_class(VIEW3D_PT_PoseHelper)
 
     